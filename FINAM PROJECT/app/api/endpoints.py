@@ -1,11 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Depends
 from pydantic import BaseModel
-from typing import Optional
-from app.services.collector import NewsCollector
+from typing import Optional, Dict
+from datetime import datetime, timedelta, timezone
+import asyncio
+import time
+from app.services.pipeline import get_pipeline
+from app.services.jobs import AnalysisJobManager
+from app.services.response_cache import EncodedResponse
+from app.api.responses import cached_response, window_query
 from app.models.schemas import TimeWindow
+from app.core.config import settings
 
 router = APIRouter()
-collector = NewsCollector()
+collector = get_pipeline().collector
+store = get_pipeline().snapshot or collector.store
+_sample_news: Dict[str, EncodedResponse] = {}
 
 @router.post("/test-connection")
 async def test_platform_connection():
@@ -19,15 +28,28 @@ async def test_platform_connection():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/sample-news")
-async def get_sample_news(time_window: TimeWindow):
-    try:
-        news = await collector.collect_news(time_window)
-        return {
+async def get_sample_news(time_window: TimeWindow, request: Request):
+    return await _sample_news_response(time_window, request)
+
+@router.api_route("/sample-news", methods=["GET", "HEAD"])
+async def poll_sample_news(request: Request, time_window: TimeWindow = Depends(window_query)):
+    return await _sample_news_response(time_window, request)
+
+async def _sample_news_response(time_window: TimeWindow, request: Request):
+    key = AnalysisJobManager.window_key(time_window)
+    encoded = _sample_news.get(key)
+    if encoded is None or not encoded.fresh:
+        try:
+            news = await collector.collect_news(time_window)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        for stale in [k for k, cached in _sample_news.items() if not cached.fresh]:
+            del _sample_news[stale]
+        encoded = _sample_news[key] = EncodedResponse.from_payload({
             "count": len(news),
-            "news": news[:5]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            "news": [dict(news_item) for news_item in news[:5]]
+        }, time.monotonic() + settings.SAMPLE_NEWS_CACHE_TTL)
+    return cached_response(request, encoded)
 
 class TickerRequest(BaseModel):
     ticker: str
@@ -37,9 +59,11 @@ class TickerRequest(BaseModel):
 async def get_events_by_ticker(ticker: str, time_window: Optional[TimeWindow] = None):
     if time_window is None:
         time_window = TimeWindow(hours=24)
+    start_time = time_window.start_time or (datetime.now(timezone.utc) - timedelta(hours=time_window.hours))
+    end_time = time_window.end_time or datetime.now(timezone.utc)
     try:
-        news = await collector.collect_news(time_window)
-        filtered = [n for n in news if ticker.upper() in str(n.get('entities', []))]
-        return {"count": len(filtered), "events": filtered[:10]}
+        count = await asyncio.to_thread(store.count, start_time, end_time, ticker)
+        events = await asyncio.to_thread(store.query, start_time, end_time, ticker, 10)
+        return {"count": count, "events": events}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
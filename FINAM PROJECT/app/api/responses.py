@@ -0,0 +1,67 @@
+from typing import List, Optional
+from datetime import datetime
+from fastapi import Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.models.schemas import TimeWindow
+from app.services.response_cache import EncodedResponse, supported_encodings
+from app.core.config import settings
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _negotiate(header: str, size: int) -> Optional[str]:
+    if size < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return None
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(coding.strip())
+    for encoding in supported_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def window_query(
+    hours: int = 24,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    horizons: Optional[List[int]] = Query(None),
+) -> TimeWindow:
+    try:
+        return TimeWindow(hours=hours, start_time=start_time, end_time=end_time, horizons=horizons)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def cached_response(request: Request, encoded: EncodedResponse) -> Response:
+    body = encoded.body
+    encoding = _negotiate(request.headers.get("accept-encoding", ""), len(body))
+    safe = request.method in ("GET", "HEAD")
+    headers = {
+        "ETag": encoded.etag_for(encoding),
+        "Cache-Control": f"public, max-age={encoded.max_age}" if safe else "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        # 304 is only defined for GET/HEAD; other methods fail the precondition
+        if safe:
+            return Response(status_code=304, headers=headers)
+        return Response(status_code=412, headers=headers)
+
+    if encoding:
+        body = encoded.compressed(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,392 @@
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+import argparse
+import gzip
+import heapq
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_worker_model = None
+
+
+def _init_encoder():
+    global _worker_model
+    from app.services.embedding_backend import create_embedding_backend
+    _worker_model = create_embedding_backend()
+
+
+def _encode_texts(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(texts)
+
+
+class ArchiveReader:
+    def __init__(self, paths: List[str], reorder_buffer: int = 10000):
+        from app.services.platform_client import PlatformClient
+        self.paths = paths
+        self.reorder_buffer = reorder_buffer
+        self.client = PlatformClient()
+        self.invalid = 0
+        self.late = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # every dump is close to time-sorted on its own; merge them into one stream
+        streams = [self._reorder(self._read(path)) for path in self.paths]
+        watermark = None
+        for news in heapq.merge(*streams, key=lambda item: item['published_at']):
+            if watermark is not None and news['published_at'] < watermark:
+                self.late += 1
+            else:
+                watermark = news['published_at']
+            yield news
+
+    def _read(self, path: str) -> Iterator[Dict[str, Any]]:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    self.invalid += 1
+                    logger.warning(f"⚠️ {path}:{line_no}: битая строка ({e})")
+                    continue
+                items = record.get("articles") or record.get("news") or record.get("items") \
+                    if any(key in record for key in ("articles", "news", "items")) else [record]
+                for item in items or []:
+                    # without a timestamp the client would stamp the item with "now"
+                    if not (item.get("published_at") or item.get("date") or item.get("timestamp")):
+                        self.invalid += 1
+                        continue
+                    yield self.client._normalize_item(item)
+
+    def _reorder(self, items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        heap: List[Tuple[datetime, int, Dict[str, Any]]] = []
+        for seq, news in enumerate(items):
+            heapq.heappush(heap, (news['published_at'], seq, news))
+            if len(heap) > self.reorder_buffer:
+                yield heapq.heappop(heap)[2]
+        while heap:
+            yield heapq.heappop(heap)[2]
+
+
+def iter_ticks(articles: Iterable[Dict[str, Any]], step: timedelta) -> Iterator[Tuple[datetime, List[Dict[str, Any]]]]:
+    tick: Optional[datetime] = None
+    chunk: List[Dict[str, Any]] = []
+    step_seconds = step.total_seconds()
+    for news in articles:
+        if tick is None:
+            # ticks sit on a fixed grid so a resumed run lines up with the checkpoint
+            first = news['published_at'].timestamp()
+            tick = datetime.fromtimestamp((first // step_seconds + 1) * step_seconds, tz=timezone.utc)
+        while news['published_at'] >= tick:
+            yield tick, chunk
+            chunk = []
+            tick += step
+        chunk.append(news)
+    if tick is not None:
+        yield tick, chunk
+
+
+class ParallelEncoder:
+    def __init__(self, processor, workers: int, batch_size: int):
+        self.processor = processor
+        self.batch_size = batch_size
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encoder
+        ) if workers else None
+
+    def submit(self, articles: List[Dict[str, Any]]) -> List[Tuple[List[bytes], Future]]:
+        if self._pool is None or not articles:
+            return []
+        texts = [self.processor._embedding_text(news) for news in articles]
+        keys = [self.processor.embedding_cache.key(text) for text in texts]
+        return [(keys[start:start + self.batch_size],
+                 self._pool.submit(_encode_texts, texts[start:start + self.batch_size]))
+                for start in range(0, len(texts), self.batch_size)]
+
+    def collect(self, pending: List[Tuple[List[bytes], Future]]) -> None:
+        for keys, future in pending:
+            self.processor.embedding_cache.put_many(keys, future.result())
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+class Checkpoint:
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.state: Dict[str, Any] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    @property
+    def tick(self) -> Optional[datetime]:
+        return datetime.fromisoformat(self.state["tick"]) if self.state.get("tick") else None
+
+    def save(self, **state: Any) -> None:
+        self.state.update(state)
+        if not self.path:
+            return
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class Backfill:
+    def __init__(self, args: argparse.Namespace):
+        from app.services.processor import NewsProcessor
+        from app.services.ranker import NewsRanker
+
+        self.args = args
+        self.step = timedelta(minutes=args.step_minutes)
+        self.window_span = timedelta(hours=args.window_hours)
+        self.processor = NewsProcessor()
+        self.ranker = NewsRanker()
+        self.encoder = ParallelEncoder(self.processor, args.encode_workers, settings.EMBEDDING_BATCH_SIZE * 4)
+        self.checkpoint = Checkpoint(args.checkpoint)
+        self.resume_tick = self.checkpoint.tick
+        self.clusterer_path = f"{args.checkpoint}.clusterer.npz" if args.checkpoint else None
+        self.replay = self._restore_clusterer()
+        self.reader = ArchiveReader(args.archives, reorder_buffer=args.reorder_buffer)
+        self.timings: Dict[str, float] = {}
+        self.stats = {"articles": 0, "ticks": 0, "skipped": 0}
+
+    def run(self) -> Dict[str, Any]:
+        if self.resume_tick:
+            logger.info(f"⏪ Продолжаем с контрольной точки {self.resume_tick.isoformat()}")
+        self.stats.update(self.checkpoint.state.get("stats", {}))
+        # the archives are re-read from the start, so skips are counted again
+        self.stats["skipped"] = 0
+
+        window: "deque[Dict[str, Any]]" = deque()
+        started = time.perf_counter()
+        processed_at_start = self.stats["articles"]
+        with self._open_output() as output:
+            pending: Optional[Tuple[datetime, List[Dict[str, Any]], list]] = None
+            try:
+                for tick, chunk in iter_ticks(self._filtered(), self.step):
+                    if self._replaying(tick) and not self.replay:
+                        # the restored clusterer already holds these ticks; only the window is rebuilt
+                        self._extend(window, chunk)
+                        self._evict(window, tick)
+                        continue
+                    # encode the next chunk in the workers while this one is clustered and ranked
+                    submitted = self.encoder.submit(chunk)
+                    if pending:
+                        self._process(*pending, window, output)
+                        if not self._replaying(pending[0]):
+                            self._report(started, processed_at_start)
+                    pending = (tick, chunk, submitted)
+                if pending:
+                    self._process(*pending, window, output)
+            finally:
+                self.encoder.shutdown()
+
+        elapsed = time.perf_counter() - started
+        processed = self.stats["articles"] - processed_at_start
+        summary = {
+            **self.stats,
+            "late_articles": self.reader.late,
+            "invalid_records": self.reader.invalid,
+            "seconds": round(elapsed, 3),
+            "articles_per_second": round(processed / elapsed, 2) if elapsed else None,
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.timings.items()},
+            "config": {
+                "clustering_mode": settings.CLUSTERING_MODE,
+                "eps": settings.CLUSTER_EPS,
+                "hotness_threshold": settings.HOTNESS_THRESHOLD,
+                "window_hours": self.args.window_hours,
+                "step_minutes": self.args.step_minutes,
+            },
+        }
+        logger.info(f"🏁 Бэкфилл завершён: {processed} новостей за {elapsed:.1f}s "
+                    f"({summary['articles_per_second']} статей/с)")
+        return summary
+
+    def _filtered(self) -> Iterator[Dict[str, Any]]:
+        start = _parse_time(self.args.start)
+        end = _parse_time(self.args.end)
+        # without a replay, articles older than the window that ends at the checkpoint are never needed again
+        skip_before = self.resume_tick - self.window_span if self.resume_tick and not self.replay else None
+        for news in self.reader:
+            published = news['published_at']
+            if start and published < start:
+                self.stats["skipped"] += 1
+                continue
+            if skip_before and published < skip_before:
+                continue
+            if end and published >= end:
+                break
+            yield news
+
+    def _process(self, tick: datetime, chunk: List[Dict[str, Any]], submitted: list,
+                 window: "deque[Dict[str, Any]]", output) -> None:
+        from app.services.article_batch import ArticleBatch
+
+        self._extend(window, chunk)
+        self._evict(window, tick)
+        self.encoder.collect(submitted)
+
+        clusters: List[Dict[str, Any]] = []
+        if window:
+            clusters = self.processor.process_news(ArticleBatch.from_dicts(window), tick - self.window_span,
+                                                   self.timings)
+        if self._replaying(tick):
+            # already written; replayed only to rebuild clusterer state the checkpoint did not have
+            return
+        top = self.ranker.rank_clusters(clusters, self.args.top_k) if clusters else []
+
+        record = {
+            "tick": tick.isoformat(),
+            "window_articles": len(window),
+            "new_articles": len(chunk),
+            "clusters": len(clusters),
+            "hot": sum(1 for ranked in top if ranked['hotness'] >= settings.HOTNESS_THRESHOLD),
+            "top": [self._describe(ranked) for ranked in top],
+        }
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+
+        self.stats["articles"] += len(chunk)
+        self.stats["ticks"] += 1
+        if self.clusterer_path and settings.CLUSTERING_MODE == "incremental":
+            self.processor.clusterer.save(self.clusterer_path, tick=tick.isoformat())
+        self.checkpoint.save(tick=tick.isoformat(), output_offset=output.tell(), stats=self.stats,
+                             archives=self.args.archives)
+
+    def _restore_clusterer(self) -> bool:
+        # DBSCAN keeps no state between ticks, so a resume never needs to replay
+        if self.resume_tick is None or settings.CLUSTERING_MODE != "incremental":
+            return False
+        if self.clusterer_path and os.path.exists(self.clusterer_path):
+            try:
+                meta = self.processor.clusterer.load(self.clusterer_path)
+                if meta.get("tick") == self.checkpoint.state["tick"]:
+                    logger.info(f"🧩 Состояние кластеризатора восстановлено из {self.clusterer_path}")
+                    return False
+                logger.warning(f"⚠️ {self.clusterer_path} не совпадает с контрольной точкой")
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"⚠️ Не удалось загрузить {self.clusterer_path}: {e}")
+            from app.services.clustering import IncrementalClusterer
+            self.processor.clusterer = IncrementalClusterer(eps=settings.CLUSTER_EPS)
+        logger.info("⏪ Состояния кластеризатора нет, повторяем кластеризацию с начала архива")
+        return True
+
+    def _replaying(self, tick: datetime) -> bool:
+        return self.resume_tick is not None and tick <= self.resume_tick
+
+    @staticmethod
+    def _extend(window: "deque[Dict[str, Any]]", chunk: List[Dict[str, Any]]) -> None:
+        ordered = not window or not chunk or window[-1]['published_at'] <= chunk[0]['published_at']
+        ordered = ordered and all(a['published_at'] <= b['published_at'] for a, b in zip(chunk, chunk[1:]))
+        window.extend(chunk)
+        if not ordered:
+            # late articles from a lagging dump; eviction only looks at the left end
+            items = sorted(window, key=lambda news: news['published_at'])
+            window.clear()
+            window.extend(items)
+
+    def _evict(self, window: "deque[Dict[str, Any]]", tick: datetime) -> None:
+        window_start = tick - self.window_span
+        while window and window[0]['published_at'] < window_start:
+            window.popleft()
+
+    def _open_output(self):
+        offset = self.checkpoint.state.get("output_offset")
+        if offset is None:
+            return open(self.args.output, "w", encoding="utf-8")
+        size = os.path.getsize(self.args.output) if os.path.exists(self.args.output) else 0
+        if size < offset:
+            raise RuntimeError(f"{self.args.output} короче контрольной точки ({size} < {offset} байт), "
+                               f"удалите {self.args.checkpoint} и запустите заново")
+        # drop anything written after the last checkpoint so resumed ticks are not duplicated
+        output = open(self.args.output, "a+", encoding="utf-8")
+        output.truncate(offset)
+        return output
+
+    def _report(self, started: float, processed_at_start: int) -> None:
+        if self.stats["ticks"] % self.args.log_every:
+            return
+        elapsed = time.perf_counter() - started
+        rate = (self.stats["articles"] - processed_at_start) / elapsed if elapsed else 0.0
+        logger.info(f"⏩ {self.checkpoint.state['tick']}: обработано {self.stats['articles']} новостей, "
+                    f"{rate:.0f} статей/с")
+
+    @staticmethod
+    def _describe(ranked: Dict[str, Any]) -> Dict[str, Any]:
+        cluster = ranked['cluster']
+        published = cluster['cluster'].published
+        return {
+            "cluster_id": cluster['cluster_id'],
+            "hotness": round(ranked['hotness'], 4),
+            "size": cluster['size'],
+            "entities": cluster['entities'][:5],
+            "tickers": cluster['tickers'][:3],
+            "first_mention": datetime.fromtimestamp(int(published.min()), tz=timezone.utc).isoformat(),
+            "last_update": datetime.fromtimestamp(int(published.max()), tz=timezone.utc).isoformat(),
+            "headline": cluster['cluster'][0]['title'],
+        }
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay archived platform dumps (JSONL, optionally gzipped) "
+                                                 "through the clustering and ranking stages")
+    parser.add_argument("archives", nargs="+", help="JSONL/JSONL.gz files, one article or API response per line")
+    parser.add_argument("--output", required=True, help="JSONL file with one ranking per tick")
+    parser.add_argument("--checkpoint", help="progress file; an existing one resumes the replay")
+    parser.add_argument("--start", help="ISO timestamp, skip older articles")
+    parser.add_argument("--end", help="ISO timestamp, stop at this time")
+    parser.add_argument("--window-hours", type=int, default=settings.SCHEDULER_WINDOW_HOURS)
+    parser.add_argument("--step-minutes", type=float, default=settings.SCHEDULER_INTERVAL_HOURS * 60)
+    parser.add_argument("--top-k", type=int, default=settings.TOP_K_EVENTS)
+    parser.add_argument("--clustering-mode", choices=["dbscan", "incremental"], default="incremental")
+    parser.add_argument("--eps", type=float, default=settings.CLUSTER_EPS)
+    parser.add_argument("--hotness-threshold", type=float, default=settings.HOTNESS_THRESHOLD)
+    parser.add_argument("--encode-workers", type=int, default=settings.WORKER_POOL_SIZE,
+                        help="processes that pre-encode the next chunk; 0 encodes inline")
+    parser.add_argument("--reorder-buffer", type=int, default=10000,
+                        help="articles held per archive to fix local ordering")
+    parser.add_argument("--market-data", choices=["fixture", "yahoo"], default="fixture",
+                        help="fixture uses MARKET_DATA_FIXTURE_PATH (or no impact); yahoo asks for live quotes")
+    parser.add_argument("--log-every", type=int, default=24, help="log throughput every N ticks")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> Dict[str, Any]:
+    args = parse_args(argv)
+    settings.CLUSTERING_MODE = args.clustering_mode
+    settings.CLUSTER_EPS = args.eps
+    settings.CLUSTER_RETENTION_HOURS = args.window_hours
+    settings.HOTNESS_THRESHOLD = args.hotness_threshold
+    settings.MARKET_DATA_BACKEND = args.market_data
+    # the replay must not rewrite the service's persistent embedding cache
+    settings.EMBEDDING_CACHE_PATH = ""
+    return Backfill(args).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(main(sys.argv[1:]), indent=2, ensure_ascii=False))
@@ -10,15 +10,66 @@ class Settings(BaseSettings):
     PLATFORM_API_URL: str = os.getenv("PLATFORM_API_URL", "https://newsapi.org/v2/everything")
 
     MAX_NEWS_PER_SOURCE: int = 100
+    PLATFORM_MAX_PAGES: int = 5
+    PLATFORM_PAGE_CONCURRENCY: int = 3
+    NEWS_SOURCE_RATE_LIMIT: float = 5.0
+
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 60.0
     HOTNESS_THRESHOLD: float = 0.3
     TOP_K_EVENTS: int = 10
+    HOTNESS_WEIGHT_VELOCITY: float = 0.5
+    HOTNESS_WEIGHT_SENTIMENT: float = 0.3
+    HOTNESS_WEIGHT_IMPACT: float = 0.2
+    HOTNESS_VELOCITY_SCALE: float = 10.0
+    TREND_BUCKET_SECONDS: int = 300
+    TREND_HISTORY_HOURS: int = 48
 
     SENTENCE_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_STORAGE: str = "float16"
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "data/onnx/all-MiniLM-L6-v2")
     SPACY_MODEL: str = "en_core_web_sm"
+    SPACY_DISABLE: List[str] = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+    SPACY_BATCH_SIZE: int = 64
+    SPACY_N_PROCESS: int = 1
+    ENTITY_MEMO_SIZE: int = 100000
+    MODEL_WARMUP: bool = True
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+    DEDUP_NUM_PERM: int = 64
+    DEDUP_BANDS: int = 8
+    DEDUP_SHINGLE_SIZE: int = 2
+
+    CLUSTERING_MODE: str = "dbscan"
+    CLUSTER_EPS: float = 0.4
+    CLUSTER_RETENTION_HOURS: int = 48
+
+    ARTICLE_STORE_PATH: str = os.getenv("ARTICLE_STORE_PATH", "data/articles.sqlite3")
+    ARTICLE_STORE_RETENTION_DAYS: int = 30
+    ARTICLE_STORE_PRUNE_INTERVAL_HOURS: int = 24
+
+    TICKER_DICTIONARY_PATH: str = os.getenv("TICKER_DICTIONARY_PATH", "")
+    TICKER_MIN_SYMBOL_LENGTH: int = 2
+
+    EMBEDDING_CACHE_SIZE: int = 50000
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.npz")
+
+    MARKET_DATA_BACKEND: str = "yahoo"
+    MARKET_DATA_FIXTURE_PATH: str = ""
+    MARKET_DATA_TTL: float = 300.0
+    MARKET_DATA_NEGATIVE_TTL: float = 3600.0
 
     LLM_API_KEY: str = os.getenv("OPENAI_API_KEY", "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")
 
     LLM_MODEL: str = "gpt-3.5-turbo"
+    LLM_CONCURRENCY: int = 5
+    LLM_TIMEOUT: float = 20.0
+    LLM_DRAFT_CACHE_SIZE: int = 1000
 
     NEWS_SOURCES: List[str] = ["https://api.reuters.com", "https://api.bloomberg.com"]
 
@@ -28,8 +79,39 @@ class Settings(BaseSettings):
         "https://www.bloomberg.com/feed/rss/markets.rss"
     ]
 
+    RSS_FETCH_TIMEOUT: float = 10.0
+    RSS_MAX_CONCURRENCY: int = 50
+
+    WORKER_POOL_MODE: str = "thread"
+    WORKER_POOL_SIZE: int = 2
+    WORKER_QUEUE_DEPTH: int = 8
+
+    RESULT_CACHE_TTL: float = 3900.0
+    RESULT_CACHE_BUCKET_SECONDS: int = 300
+    RESULT_CACHE_MAX_ENTRIES: int = 256
+    JOB_RETENTION_SECONDS: float = 3600.0
+    JOB_MAX_WAIT_SECONDS: float = 60.0
+
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL_HOURS: float = 1.0
+    SCHEDULER_WINDOW_HOURS: int = 24
+
+    RESPONSE_STAGE_TIMINGS: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 5
+    SAMPLE_NEWS_CACHE_TTL: float = 60.0
+
+    DEPLOYMENT_MODE: str = "single"
+    API_WORKERS: int = 4
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+    SNAPSHOT_HOURS: int = 72
+    SNAPSHOT_POLL_SECONDS: float = 5.0
+    SNAPSHOT_KEEP: int = 2
+
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    RELOAD: bool = False
 
     model_config = {"env_file": ".env"}
 
@@ -0,0 +1,61 @@
+from typing import Dict, Optional
+from contextlib import contextmanager
+import os
+import time
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST,
+                               generate_latest, multiprocess)
+
+STAGE_SECONDS = Histogram(
+    "radar_stage_duration_seconds",
+    "Duration of RADAR pipeline stages",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+STAGE_IN_FLIGHT = Gauge(
+    "radar_stage_in_flight",
+    "Pipeline stages currently running",
+    ["stage"],
+    multiprocess_mode="livesum"
+)
+ARTICLES_COLLECTED = Counter("radar_articles_collected_total", "Articles collected", ["source"])
+CLUSTERS_FORMED = Counter("radar_clusters_total", "Clusters produced by the processor")
+CACHE_REQUESTS = Counter("radar_cache_requests_total", "Cache lookups", ["cache", "result"])
+LLM_FAILURES = Counter("radar_llm_failures_total", "Failed LLM draft generations", ["reason"])
+MARKET_DATA_ERRORS = Counter("radar_market_data_errors_total", "Market data (yfinance) errors")
+EXECUTOR_PENDING = Gauge(
+    "radar_executor_pending",
+    "Stage calls running or queued in the worker pool",
+    multiprocess_mode="livesum"
+)
+
+
+@contextmanager
+def track_stage(stage: str, timings: Optional[Dict[str, float]] = None):
+    STAGE_IN_FLIGHT.labels(stage).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_IN_FLIGHT.labels(stage).dec()
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+def render_metrics() -> bytes:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
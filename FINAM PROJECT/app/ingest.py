@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import signal
+from app.models.schemas import TimeWindow
+from app.services.pipeline import RadarPipeline
+from app.services.jobs import AnalysisJobManager
+from app.services.scheduler import create_scheduler
+from app.services.snapshot import SnapshotWriter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    pipeline = RadarPipeline()
+    job_manager = AnalysisJobManager(pipeline)
+    writer = SnapshotWriter(settings.SNAPSHOT_DIR, keep=settings.SNAPSHOT_KEEP)
+
+    async def refresh_and_publish(time_window: TimeWindow) -> None:
+        await job_manager.refresh(time_window)
+        try:
+            await pipeline.publish_snapshot(writer, job_manager.export_results())
+        except Exception as e:
+            logger.error(f"❌ Не удалось опубликовать снимок: {e}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await pipeline.collector.start()
+    await pipeline.warm_up()
+    scheduler = create_scheduler(refresh_and_publish, pipeline.collector.prune_store)
+    scheduler.start()
+    logger.info(f"🛰️ Ingest-процесс запущен: снимки в {settings.SNAPSHOT_DIR} каждые "
+                f"{settings.SCHEDULER_INTERVAL_HOURS} ч")
+    try:
+        await stop.wait()
+    finally:
+        scheduler.shutdown(wait=False)
+        await pipeline.collector.close()
+        pipeline.executor.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
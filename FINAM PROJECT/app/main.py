@@ -1,13 +1,49 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.models.schemas import TimeWindow, RadarResponse
-from app.services.pipeline import RadarPipeline
+from app.models.schemas import TimeWindow, RadarResponse, AnalysisJobStatus
+from app.services.pipeline import get_pipeline
+from app.services.executor import ExecutorOverloadedError
+from app.services.jobs import AnalysisJobManager
+from app.services.scheduler import create_scheduler
+from app.core.config import settings
+from app.core.metrics import render_metrics, METRICS_CONTENT_TYPE
+import asyncio
+import json
+import logging
 from app.api.endpoints import router as api_router
+from app.api.responses import cached_response, window_query
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # in multi-worker mode the ingest process (app.ingest) owns the models and the scheduler
+    ingest = settings.DEPLOYMENT_MODE != "multi"
+    await pipeline.collector.start()
+    warm_up = asyncio.create_task(pipeline.warm_up()) if ingest and settings.MODEL_WARMUP else None
+    scheduler = create_scheduler(job_manager.refresh, pipeline.collector.prune_store) if ingest and settings.SCHEDULER_ENABLED else None
+    if scheduler:
+        scheduler.start()
+        logger.info(f"🕐 Scheduler запущен: анализ каждые {settings.SCHEDULER_INTERVAL_HOURS} ч")
+    yield
+    if scheduler:
+        scheduler.shutdown(wait=False)
+    if warm_up and not warm_up.done():
+        warm_up.cancel()
+    await pipeline.collector.close()
+    pipeline.executor.shutdown()
+
 
 app = FastAPI(
     title="RADAR API",
     description="Система поиска и оценки горячих новостей в финансах",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -20,20 +56,88 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api/v1")
 
-pipeline = RadarPipeline()
+pipeline = get_pipeline()
+job_manager = AnalysisJobManager(pipeline, pipeline.snapshot)
 
 @app.get("/")
 async def root():
     return {"message": "RADAR API работает 🚀", "platform": "Интеграция с вашей платформой"}
 
 @app.post("/analyze", response_model=RadarResponse)
-async def analyze_news(time_window: TimeWindow):
+async def analyze_news(time_window: TimeWindow, request: Request):
+    return await _analyze(time_window, request)
+
+@app.api_route("/analyze", methods=["GET", "HEAD"], response_model=RadarResponse)
+async def poll_analysis(request: Request, time_window: TimeWindow = Depends(window_query)):
+    return await _analyze(time_window, request)
+
+async def _analyze(time_window: TimeWindow, request: Request):
+    try:
+        encoded = await job_manager.run(time_window)
+        return cached_response(request, encoded)
+    except ExecutorOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/stream")
+async def analyze_news_stream(time_window: TimeWindow, request: Request):
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    frames = pipeline.stream_time_window(time_window)
     try:
-        result = await pipeline.process_time_window(time_window)
-        return result
+        first_frame = await frames.__anext__()
+    except ExecutorOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    def encode(frame):
+        payload = json.dumps(frame, ensure_ascii=False)
+        return f"event: {frame['type']}\ndata: {payload}\n\n" if sse else payload + "\n"
+
+    async def body():
+        yield encode(first_frame)
+        try:
+            async for frame in frames:
+                yield encode(frame)
+        except Exception as e:
+            yield encode({"type": "error", "detail": str(e)})
+        finally:
+            await frames.aclose()
+
+    return StreamingResponse(body(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+@app.post("/analyze/jobs", response_model=AnalysisJobStatus, status_code=202)
+async def submit_analysis_job(time_window: TimeWindow):
+    return job_manager.submit(time_window).to_status()
+
+@app.get("/analyze/jobs/{job_id}", response_model=AnalysisJobStatus)
+async def get_analysis_job(job_id: str, wait: Optional[float] = None):
+    job = job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait:
+        await job_manager.wait(job, timeout=min(wait, settings.JOB_MAX_WAIT_SECONDS))
+    return job.to_status()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "RADAR"}
\ No newline at end of file
+    return {"status": "healthy", "service": "RADAR"}
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    ready = pipeline.ready
+    if not ready:
+        response.status_code = 503
+    if pipeline.snapshot:
+        return {"ready": ready, "deployment_mode": settings.DEPLOYMENT_MODE, "snapshot": pipeline.snapshot.status()}
+    return {
+        "ready": ready,
+        "deployment_mode": settings.DEPLOYMENT_MODE,
+        "worker_pool": pipeline.executor.mode,
+        "models": pipeline.processor.models.status()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
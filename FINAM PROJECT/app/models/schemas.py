@@ -1,11 +1,23 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from app.core.config import settings
 
 class TimeWindow(BaseModel):
     hours: int = 24
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    horizons: Optional[List[int]] = None
+
+    @field_validator("horizons")
+    @classmethod
+    def check_horizons(cls, horizons: Optional[List[int]]) -> Optional[List[int]]:
+        # acceleration compares a horizon with the one before it, so both must fit in the history
+        limit = settings.TREND_HISTORY_HOURS // 2
+        for hours in horizons or []:
+            if not 1 <= hours <= limit:
+                raise ValueError(f"horizon must be between 1 and {limit} hours, got {hours}")
+        return horizons
 
 class Source(BaseModel):
     url: HttpUrl
@@ -18,6 +30,12 @@ class Timeline(BaseModel):
     confirmation: Optional[datetime] = None
     last_update: datetime
 
+class TrendStats(BaseModel):
+    horizon_hours: int
+    articles: int
+    velocity: float
+    acceleration: float
+
 class NewsEvent(BaseModel):
     headline: str
     hotness: float
@@ -27,8 +45,33 @@ class NewsEvent(BaseModel):
     timeline: Timeline
     draft: Dict[str, Any]
     dedup_group: str
+    trend: Optional[TrendStats] = None
+
+class EventSkeleton(BaseModel):
+    rank: int
+    dedup_group: str
+    hotness: float
+    entities: List[str]
+    sources: List[Source]
+    timeline: Timeline
+    trend: Optional[TrendStats] = None
+
+class HorizonRanking(BaseModel):
+    horizon_hours: int
+    top_events: List[NewsEvent]
 
 class RadarResponse(BaseModel):
     time_window: TimeWindow
     top_events: List[NewsEvent]
     processing_time: float
+    horizons: Optional[List[HorizonRanking]] = None
+    stage_timings: Optional[Dict[str, float]] = None
+
+class AnalysisJobStatus(BaseModel):
+    job_id: str
+    status: str
+    window_key: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[RadarResponse] = None
+    error: Optional[str] = None
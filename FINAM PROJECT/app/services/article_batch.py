@@ -0,0 +1,251 @@
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Mapping, Sequence, Union
+from collections.abc import Mapping as MappingABC, Sequence as SequenceABC
+from datetime import datetime, timezone
+import numpy as np
+
+_TEXT_FIELDS = ("title", "content", "summary", "url", "author")
+_INTERNED_FIELDS = ("source", "language", "category")
+_DEFAULTS = {"source": "unknown", "language": "en", "category": ""}
+_READONLY_FIELDS = frozenset(("id", "published_at") + _TEXT_FIELDS + _INTERNED_FIELDS)
+_FIELDS = ("id", "title", "content", "summary", "published_at", "url", "source", "author", "language",
+           "entities", "sentiment", "category", "tickers", "duplicate_of")
+
+
+class _Interner:
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ArticleView(MappingABC):
+    __slots__ = ("batch", "row")
+
+    def __init__(self, batch: "ArticleBatch", row: int):
+        self.batch = batch
+        self.row = row
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.batch.value(self.row, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.batch.set_value(self.row, key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.batch.keys(self.row) if self.batch.value(self.row, key) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ArticleView({self.batch.ids[self.row]!r})"
+
+
+class ArticleBatch(SequenceABC):
+    def __init__(self, ids: List[str], text: str, text_bounds: np.ndarray, published: np.ndarray,
+                 sentiment: np.ndarray, interned: Dict[str, np.ndarray], tables: Dict[str, List[str]],
+                 entities: List[List[str]], tickers: List[Optional[List[str]]],
+                 duplicate_of: Optional[List[Optional[str]]] = None,
+                 extra: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.ids = ids
+        self.text = text
+        self.text_bounds = text_bounds
+        self.published = published
+        self.sentiment = sentiment
+        self.interned = interned
+        self.tables = tables
+        self.entities = entities
+        self.tickers = tickers
+        self.duplicate_of = duplicate_of if duplicate_of is not None else [None] * len(ids)
+        self.extra = extra or {}
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[Mapping[str, Any]]) -> "ArticleBatch":
+        builder = ArticleBatchBuilder()
+        builder.extend(items)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [ArticleView(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ArticleView(self, index)
+
+    def __iter__(self) -> Iterator[ArticleView]:
+        return (ArticleView(self, row) for row in range(len(self)))
+
+    def take(self, rows: Union[np.ndarray, Sequence[int]]) -> "ArticleSlice":
+        return ArticleSlice(self, np.asarray(rows, dtype=np.int64))
+
+    def keys(self, row: Optional[int] = None) -> Iterable[str]:
+        if row is not None and row in self.extra:
+            return _FIELDS + tuple(self.extra[row])
+        return _FIELDS
+
+    def value(self, row: int, key: str) -> Any:
+        if key == "id":
+            return self.ids[row]
+        if key in _TEXT_FIELDS:
+            start, end = self.text_bounds[row, _TEXT_FIELDS.index(key)]
+            return self.text[start:end]
+        if key == "published_at":
+            return datetime.fromtimestamp(int(self.published[row]), tz=timezone.utc)
+        if key in self.interned:
+            return self.tables[key][self.interned[key][row]]
+        if key == "sentiment":
+            return float(self.sentiment[row])
+        if key == "entities":
+            return self.entities[row]
+        if key == "tickers":
+            return self.tickers[row]
+        if key == "duplicate_of":
+            return self.duplicate_of[row]
+        if row in self.extra and key in self.extra[row]:
+            return self.extra[row][key]
+        raise KeyError(key)
+
+    def set_value(self, row: int, key: str, value: Any) -> None:
+        if key == "entities":
+            self.entities[row] = list(value)
+        elif key == "tickers":
+            self.tickers[row] = value
+        elif key == "duplicate_of":
+            self.duplicate_of[row] = value
+        elif key == "sentiment":
+            self.sentiment[row] = value or 0.0
+        elif key in _READONLY_FIELDS:
+            # packed into shared text/array columns; rebuild the batch to change them
+            raise TypeError(f"'{key}' is a read-only column of ArticleBatch")
+        else:
+            self.extra.setdefault(row, {})[key] = value
+
+    def nbytes(self) -> int:
+        arrays = (self.text_bounds, self.published, self.sentiment, *self.interned.values())
+        return len(self.text.encode("utf-8")) + sum(array.nbytes for array in arrays)
+
+
+class ArticleSlice(SequenceABC):
+    __slots__ = ("batch", "rows")
+
+    def __init__(self, batch: ArticleBatch, rows: np.ndarray):
+        self.batch = batch
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return ArticleSlice(self.batch, self.rows[index])
+        return ArticleView(self.batch, int(self.rows[index]))
+
+    def __iter__(self) -> Iterator[ArticleView]:
+        return (ArticleView(self.batch, int(row)) for row in self.rows)
+
+    @property
+    def published(self) -> np.ndarray:
+        return self.batch.published[self.rows]
+
+    @property
+    def sentiment(self) -> np.ndarray:
+        return self.batch.sentiment[self.rows]
+
+
+class ArticleBatchBuilder:
+    def __init__(self):
+        self._ids: List[str] = []
+        self._parts: List[str] = []
+        self._row_parts: List[int] = []
+        self._length = 0
+        self._bounds: List[List[int]] = []
+        self._published: List[int] = []
+        self._sentiment: List[float] = []
+        self._interners = {field: _Interner() for field in _INTERNED_FIELDS}
+        self._codes: Dict[str, List[int]] = {field: [] for field in _INTERNED_FIELDS}
+        self._entities: List[List[str]] = []
+        self._tickers: List[Optional[List[str]]] = []
+        self._duplicate_of: List[Optional[str]] = []
+        self._extra: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def append(self, news: Mapping[str, Any]) -> None:
+        row = len(self._ids)
+        self._ids.append(str(news['id']))
+        self._row_parts.append(len(self._parts))
+        bounds: List[int] = []
+        content_bounds = None
+        for field in _TEXT_FIELDS:
+            value = news.get(field) or ""
+            if field == "summary" and value == news.get("content"):
+                # RSS items repeat the summary as content; keep a single copy
+                bounds.extend(content_bounds)
+                continue
+            start = self._length
+            self._parts.append(value)
+            self._length += len(value)
+            bounds.extend((start, self._length))
+            if field == "content":
+                content_bounds = (start, self._length)
+        self._bounds.append(bounds)
+
+        published_at = news['published_at']
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        self._published.append(int(published_at.timestamp()))
+        self._sentiment.append(float(news.get('sentiment') or 0.0))
+        for field in _INTERNED_FIELDS:
+            self._codes[field].append(self._interners[field].code(str(news.get(field) or _DEFAULTS[field])))
+        self._entities.append(list(news.get('entities') or []))
+        self._tickers.append(news.get('tickers'))
+        self._duplicate_of.append(news.get('duplicate_of'))
+        extra = {key: value for key, value in news.items() if key not in _FIELDS}
+        if extra:
+            self._extra[row] = extra
+
+    def extend(self, items: Iterable[Mapping[str, Any]]) -> None:
+        for news in items:
+            self.append(news)
+
+    def truncate(self, size: int) -> None:
+        if size >= len(self._ids):
+            return
+        self._length = self._bounds[size][0]
+        self._parts = self._parts[:self._row_parts[size]]
+        for name in ("_ids", "_row_parts", "_bounds", "_published", "_sentiment", "_entities", "_tickers", "_duplicate_of"):
+            setattr(self, name, getattr(self, name)[:size])
+        for field in _INTERNED_FIELDS:
+            self._codes[field] = self._codes[field][:size]
+        self._extra = {row: extra for row, extra in self._extra.items() if row < size}
+
+    def build(self) -> ArticleBatch:
+        n = len(self._ids)
+        return ArticleBatch(
+            ids=self._ids,
+            text="".join(self._parts),
+            text_bounds=np.array(self._bounds, dtype=np.int64).reshape(n, len(_TEXT_FIELDS), 2),
+            published=np.array(self._published, dtype=np.int64),
+            sentiment=np.array(self._sentiment, dtype=np.float32),
+            interned={field: np.array(self._codes[field], dtype=np.int32) for field in _INTERNED_FIELDS},
+            tables={field: self._interners[field].values for field in _INTERNED_FIELDS},
+            entities=self._entities,
+            tickers=self._tickers,
+            duplicate_of=self._duplicate_of,
+            extra=self._extra
+        )
@@ -0,0 +1,127 @@
+from typing import List, Dict, Any, Optional, Sequence, Mapping
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import sqlite3
+import threading
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    published_at INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles (published_at);
+CREATE TABLE IF NOT EXISTS article_entities (
+    entity TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    published_at INTEGER NOT NULL,
+    PRIMARY KEY (entity, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_entities_time ON article_entities (entity, published_at);
+CREATE INDEX IF NOT EXISTS idx_article_entities_article ON article_entities (article_id);
+"""
+
+
+class ArticleStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.ARTICLE_STORE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def upsert(self, articles: Sequence[Mapping[str, Any]]) -> int:
+        article_rows = []
+        entity_rows = []
+        for news in articles:
+            published_at = self._to_epoch(news['published_at'])
+            article_rows.append((str(news['id']), published_at, json.dumps(dict(news), default=self._json_default)))
+            entity_rows.extend((entity, str(news['id']), published_at)
+                               for entity in {self.normalize_entity(e) for e in news.get('entities', [])} if entity)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO articles (id, published_at, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET published_at = excluded.published_at, payload = excluded.payload",
+                article_rows
+            )
+            # re-extraction can drop entities, so replace the whole set rather than merging into it
+            self._conn.executemany(
+                "DELETE FROM article_entities WHERE article_id = ?",
+                [(row[0],) for row in article_rows]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO article_entities (entity, article_id, published_at) VALUES (?, ?, ?)",
+                entity_rows
+            )
+        return len(article_rows)
+
+    def query(self, start: datetime, end: datetime, entity: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if entity:
+            sql = ("SELECT a.payload FROM article_entities e JOIN articles a ON a.id = e.article_id "
+                   "WHERE e.entity = ? AND e.published_at BETWEEN ? AND ? ORDER BY e.published_at DESC")
+            params: tuple = (self.normalize_entity(entity), self._to_epoch(start), self._to_epoch(end))
+        else:
+            sql = "SELECT payload FROM articles WHERE published_at BETWEEN ? AND ? ORDER BY published_at DESC"
+            params = (self._to_epoch(start), self._to_epoch(end))
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._decode(row[0]) for row in rows]
+
+    def count(self, start: datetime, end: datetime, entity: Optional[str] = None) -> int:
+        if entity:
+            sql = "SELECT COUNT(*) FROM article_entities WHERE entity = ? AND published_at BETWEEN ? AND ?"
+            params: tuple = (self.normalize_entity(entity), self._to_epoch(start), self._to_epoch(end))
+        else:
+            sql = "SELECT COUNT(*) FROM articles WHERE published_at BETWEEN ? AND ?"
+            params = (self._to_epoch(start), self._to_epoch(end))
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def prune(self, before: datetime) -> int:
+        cutoff = self._to_epoch(before)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM article_entities WHERE published_at < ?", (cutoff,))
+            deleted = self._conn.execute("DELETE FROM articles WHERE published_at < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"🧹 Из хранилища удалено {deleted} устаревших новостей")
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def normalize_entity(entity: str) -> str:
+        return str(entity).strip().upper()
+
+    @staticmethod
+    def _to_epoch(dt: datetime) -> int:
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _decode(payload: str) -> Dict[str, Any]:
+        news = json.loads(payload)
+        news['published_at'] = datetime.fromisoformat(news['published_at'])
+        return news
@@ -0,0 +1,126 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import numpy as np
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalClusterer:
+    def __init__(self, eps: float = 0.4):
+        self.eps = eps
+        self._clusters: Dict[str, Dict[str, Any]] = {}
+        self._assignments: Dict[str, str] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def is_known(self, article_id: str) -> bool:
+        return article_id in self._assignments
+
+    def labels(self, article_ids: List[str]) -> List[Optional[str]]:
+        return [self._assignments.get(article_id) for article_id in article_ids]
+
+    def expire(self, window_start: datetime) -> int:
+        cutoff = window_start.timestamp()
+        expired = 0
+        with self._lock:
+            for cluster_id in list(self._clusters):
+                cluster = self._clusters[cluster_id]
+                stale = [aid for aid, (ts, _) in cluster['members'].items() if ts < cutoff]
+                for article_id in stale:
+                    _, vector = cluster['members'].pop(article_id)
+                    cluster['sum'] -= vector
+                    del self._assignments[article_id]
+                expired += len(stale)
+                if not cluster['members']:
+                    del self._clusters[cluster_id]
+        if expired:
+            logger.info(f"🧹 Из окна выпало {expired} новостей, активных кластеров: {len(self._clusters)}")
+        return expired
+
+    def assign(self, article_ids: List[str], published_at: List[datetime], embeddings: np.ndarray) -> None:
+        if not article_ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            cluster_ids = list(self._clusters)
+            capacity = max(16, 2 * (len(cluster_ids) + len(article_ids)))
+            centroids = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            for row, cluster_id in enumerate(cluster_ids):
+                centroids[row] = self._normalized_centroid(cluster_id)
+
+            for article_id, published, vector in zip(article_ids, published_at, vectors):
+                if article_id in self._assignments:
+                    continue
+                n_active = len(cluster_ids)
+                row = -1
+                if n_active:
+                    similarities = centroids[:n_active] @ vector
+                    best = int(np.argmax(similarities))
+                    if 1.0 - similarities[best] <= self.eps:
+                        row = best
+
+                if row == -1:
+                    cluster_id = f"evt_{self._next_id}"
+                    self._next_id += 1
+                    self._clusters[cluster_id] = {'sum': np.zeros_like(vector), 'members': {}}
+                    cluster_ids.append(cluster_id)
+                    row = n_active
+                else:
+                    cluster_id = cluster_ids[row]
+
+                cluster = self._clusters[cluster_id]
+                cluster['members'][article_id] = (published.timestamp(), vector)
+                cluster['sum'] += vector
+                self._assignments[article_id] = cluster_id
+                centroids[row] = self._normalized_centroid(cluster_id)
+
+    def save(self, path: str, **meta: Any) -> None:
+        with self._lock:
+            cluster_ids = list(self._clusters)
+            members = [(article_id, row, ts, vector) for row, cluster_id in enumerate(cluster_ids)
+                       for article_id, (ts, vector) in self._clusters[cluster_id]['members'].items()]
+            dim = len(members[0][3]) if members else 0
+            arrays = {
+                'cluster_ids': np.array(cluster_ids, dtype=str),
+                'sums': np.array([self._clusters[cluster_id]['sum'] for cluster_id in cluster_ids],
+                                 dtype=np.float32).reshape(len(cluster_ids), dim),
+                'member_ids': np.array([member[0] for member in members], dtype=str),
+                'member_clusters': np.array([member[1] for member in members], dtype=np.int64),
+                'member_published': np.array([member[2] for member in members], dtype=np.float64),
+                'member_vectors': np.array([member[3] for member in members], dtype=np.float32).reshape(len(members), dim),
+                'next_id': np.array(self._next_id),
+                **{key: np.array(value) for key, value in meta.items()},
+            }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> Dict[str, Any]:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        cluster_ids = [str(cluster_id) for cluster_id in arrays.pop('cluster_ids')]
+        sums = arrays.pop('sums')
+        member_clusters = arrays.pop('member_clusters')
+        member_published = arrays.pop('member_published')
+        member_vectors = arrays.pop('member_vectors')
+        with self._lock:
+            self._clusters = {cluster_id: {'sum': sums[row].copy(), 'members': {}}
+                              for row, cluster_id in enumerate(cluster_ids)}
+            self._assignments = {}
+            for article_id, row, ts, vector in zip(arrays.pop('member_ids'), member_clusters, member_published,
+                                                   member_vectors):
+                cluster_id = cluster_ids[int(row)]
+                self._clusters[cluster_id]['members'][str(article_id)] = (float(ts), vector)
+                self._assignments[str(article_id)] = cluster_id
+            self._next_id = int(arrays.pop('next_id'))
+        return {key: value.item() for key, value in arrays.items()}
+
+    def _normalized_centroid(self, cluster_id: str) -> np.ndarray:
+        total = self._clusters[cluster_id]['sum']
+        return total / max(float(np.linalg.norm(total)), 1e-12)
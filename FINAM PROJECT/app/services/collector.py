@@ -1,8 +1,15 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Mapping
 from app.models.schemas import TimeWindow
 from app.services.platform_client import PlatformClient
+from app.services.article_store import ArticleStore
+from app.services.article_batch import ArticleBatch, ArticleBatchBuilder
+from app.services.ticker_matcher import get_ticker_matcher
+from app.core.metrics import track_stage, ARTICLES_COLLECTED
 from app.core.config import settings
+import aiohttp
+import asyncio
 import feedparser
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
 
@@ -12,55 +19,136 @@ logger = logging.getLogger(__name__)
 class NewsCollector:
     def __init__(self):
         self.platform_client = PlatformClient()
+        self.store = ArticleStore()
+        self._feed_cache: Dict[str, Dict[str, Any]] = {}
+        self._rss_session: Optional[aiohttp.ClientSession] = None
 
-    async def collect_news(self, time_window: TimeWindow) -> List[Dict[str, Any]]:
+    async def start(self) -> None:
+        await self.platform_client.start()
+        if self._rss_session is None:
+            self._rss_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.RSS_FETCH_TIMEOUT),
+                connector=aiohttp.TCPConnector(
+                    limit=settings.HTTP_POOL_SIZE,
+                    limit_per_host=settings.HTTP_POOL_PER_HOST,
+                    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=300
+                )
+            )
+
+    async def close(self) -> None:
+        await self.platform_client.close()
+        if self._rss_session is not None:
+            await self._rss_session.close()
+            self._rss_session = None
+
+    async def collect_news(self, time_window: TimeWindow,
+                           timings: Optional[Dict[str, float]] = None) -> ArticleBatch:
+        await self.start()
+        builder = ArticleBatchBuilder()
         try:
-            async with self.platform_client as client:
-                news_data = await client.get_news(time_window)
-                logger.info(f"✅ Получено {len(news_data)} новостей из платформы")
-                news_data.extend(await self._collect_from_rss(time_window))
-                return news_data
+            with track_stage("collect", timings):
+                async for news in self.platform_client.iter_news(time_window):
+                    builder.append(news)
+            ARTICLES_COLLECTED.labels("platform").inc(len(builder))
+            logger.info(f"✅ Получено {len(builder)} новостей из платформы")
         except Exception as e:
             logger.error(f"❌ Ошибка при сборе новостей: {e}")
-            return await self._collect_from_rss(time_window)
+            builder.truncate(0)
 
-    @staticmethod
-    async def _collect_from_rss(time_window: TimeWindow) -> List[Dict[str, Any]]:
-        news_data = []
+        with track_stage("rss", timings):
+            rss_news = await self._collect_from_rss(time_window)
+        ARTICLES_COLLECTED.labels("rss").inc(len(rss_news))
+        builder.extend(rss_news)
+        return builder.build()
+
+    async def save_news(self, news_data: Sequence[Mapping[str, Any]]) -> None:
+        if not news_data:
+            return
+        try:
+            await asyncio.to_thread(self.store.upsert, news_data)
+        except Exception as e:
+            logger.error(f"❌ Не удалось сохранить новости в хранилище: {e}")
+
+    async def prune_store(self) -> None:
+        try:
+            await asyncio.to_thread(
+                self.store.prune,
+                datetime.now(timezone.utc) - timedelta(days=settings.ARTICLE_STORE_RETENTION_DAYS)
+            )
+        except Exception as e:
+            logger.error(f"❌ Не удалось очистить хранилище новостей: {e}")
+
+    async def _collect_from_rss(self, time_window: TimeWindow) -> List[Dict[str, Any]]:
         start_time = time_window.start_time or (datetime.now(timezone.utc) - timedelta(hours=time_window.hours))
         end_time = time_window.end_time or datetime.now(timezone.utc)
-        for rss_url in settings.RSS_FEEDS:
-            try:
-                feed = feedparser.parse(rss_url)
-                for entry in feed.entries[:settings.MAX_NEWS_PER_SOURCE]:
-                    pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc) if 'published_parsed' in entry else datetime.now(timezone.utc)
-                    if start_time <= pub_date <= end_time:
-                        news_item = {
-                            "id": entry.id or str(hash(entry.title)),
-                            "title": entry.title,
-                            "content": entry.summary or "",
-                            "summary": entry.summary or "",
-                            "published_at": pub_date,
-                            "url": entry.link,
-                            "source": feed.feed.title or "RSS",
-                            "author": entry.author or "",
-                            "language": "en",
-                            "entities": [],
-                            "sentiment": 0,
-                            "category": entry.get('tags', [{}])[0].term if entry.get('tags') else ""
-                        }
-                        news_data.append(news_item)
-                logger.info(f"RSS {rss_url}: {len(feed.entries)} entries")
-            except Exception as e:
-                logger.error(f"RSS ошибка {rss_url}: {e}")
+        semaphore = asyncio.Semaphore(settings.RSS_MAX_CONCURRENCY)
+        feeds = await asyncio.gather(*(self._fetch_feed(self._rss_session, semaphore, rss_url)
+                                       for rss_url in settings.RSS_FEEDS))
+        return [news_item for feed_items in feeds for news_item in feed_items
+                if start_time <= news_item['published_at'] <= end_time]
+
+    async def _fetch_feed(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                          rss_url: str) -> List[Dict[str, Any]]:
+        cached = self._feed_cache.get(rss_url, {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            async with semaphore:
+                async with session.get(rss_url, headers=headers) as response:
+                    if response.status == 304:
+                        logger.info(f"RSS {rss_url}: не изменился (304)")
+                        return cached.get('items', [])
+                    if response.status != 200:
+                        raise Exception(f"HTTP {response.status}")
+                    body = await response.read()
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+
+            items = await asyncio.to_thread(self._parse_feed, body)
+            self._feed_cache[rss_url] = {'etag': etag, 'last_modified': last_modified, 'items': items}
+            logger.info(f"RSS {rss_url}: {len(items)} entries")
+            return items
+        except Exception as e:
+            logger.error(f"RSS ошибка {rss_url}: {e!r}")
+            return []
+
+    @staticmethod
+    def _parse_feed(body: bytes) -> List[Dict[str, Any]]:
+        feed = feedparser.parse(body)
+        matcher = get_ticker_matcher()
+        news_data = []
+        for entry in feed.entries[:settings.MAX_NEWS_PER_SOURCE]:
+            tickers = matcher.match(entry.get('title', '') + ' ' + (entry.get('summary') or ""))
+            pub_date = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc) if entry.get('published_parsed') else datetime.now(timezone.utc)
+            news_item = {
+                "id": entry.get('id') or hashlib.sha1(entry.get('title', '').encode('utf-8')).hexdigest(),
+                "title": entry.get('title', ''),
+                "content": entry.get('summary') or "",
+                "summary": entry.get('summary') or "",
+                "published_at": pub_date,
+                "url": entry.get('link', ''),
+                "source": feed.feed.get('title') or "RSS",
+                "author": entry.get('author') or "",
+                "language": "en",
+                "entities": list(tickers),
+                "tickers": tickers,
+                "sentiment": 0,
+                "category": entry.get('tags', [{}])[0].term if entry.get('tags') else ""
+            }
+            news_data.append(news_item)
         return news_data
 
     async def test_connection(self) -> bool:
         try:
-            async with self.platform_client as client:
-                test_window = TimeWindow(hours=1)
-                news = await client.get_news(test_window)
-                return len(news) >= 0
+            await self.start()
+            test_window = TimeWindow(hours=1)
+            news = await self.platform_client.get_news(test_window)
+            return len(news) >= 0
         except Exception as e:
             logger.error(f"❌ Тест подключения не пройден: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,118 @@
+from typing import List, Dict, Optional, Tuple, Union, Sequence, Mapping, Any
+from collections import defaultdict
+import hashlib
+import logging
+import re
+import numpy as np
+from app.services.article_batch import ArticleBatch, ArticleView
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+class NearDuplicateFilter:
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 8, shingle_size: int = 2,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def collapse(self, raw_news: Union[ArticleBatch, Sequence[Mapping[str, Any]]]
+                 ) -> Tuple[List[ArticleView], Dict[str, List[ArticleView]]]:
+        if not isinstance(raw_news, ArticleBatch):
+            raw_news = ArticleBatch.from_dicts(raw_news)
+        order = np.argsort(raw_news.published, kind="stable")
+        representatives: List[ArticleView] = []
+        duplicates: Dict[str, List[ArticleView]] = defaultdict(list)
+        seen: set = set()
+        by_url: Dict[str, ArticleView] = {}
+        by_content: Dict[str, ArticleView] = {}
+        rep_signatures = np.zeros((len(raw_news), self.num_perm), dtype=np.uint64)
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+
+        signatures = self._signatures([news.get('title', '') for news in raw_news])
+        has_title = signatures.any(axis=1)
+
+        for idx in order.tolist():
+            news = raw_news[idx]
+            url_key, content_key = self._exact_keys(news)
+            if news['id'] in seen:
+                continue
+            seen.add(news['id'])
+
+            # the same URL from a second source is still a source of the story, not noise
+            rep = by_url.get(url_key) if url_key else None
+            if rep is None and content_key:
+                rep = by_content.get(content_key)
+            signature = None
+            if rep is None:
+                signature = signatures[idx] if has_title[idx] else None
+                rep_idx = self._find_similar(signature, rep_signatures, buckets) if signature is not None else None
+                rep = representatives[rep_idx] if rep_idx is not None else None
+
+            if rep is None:
+                rep = news
+                if signature is not None:
+                    rep_signatures[len(representatives)] = signature
+                    for band in self._bands(signature):
+                        buckets[band].append(len(representatives))
+                representatives.append(news)
+            else:
+                duplicates[rep['id']].append(news)
+            if url_key:
+                by_url.setdefault(url_key, rep)
+            if content_key:
+                by_content.setdefault(content_key, rep)
+
+        return representatives, duplicates
+
+    def _find_similar(self, signature: np.ndarray, signatures: np.ndarray,
+                      buckets: Dict[Tuple[int, bytes], List[int]]) -> Optional[int]:
+        candidates = {rep_idx for band in self._bands(signature) for rep_idx in buckets.get(band, ())}
+        if not candidates:
+            return None
+        candidates = np.fromiter(sorted(candidates), dtype=np.int64, count=len(candidates))
+        matches = np.count_nonzero(signatures[candidates] == signature, axis=1)
+        best = int(np.argmax(matches))
+        return int(candidates[best]) if matches[best] >= self.threshold * self.num_perm else None
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _signatures(self, titles: List[str], chunk_size: int = 2048) -> np.ndarray:
+        signatures = np.zeros((len(titles), self.num_perm), dtype=np.uint64)
+        for start in range(0, len(titles), chunk_size):
+            shingles = [self._shingles(title) for title in titles[start:start + chunk_size]]
+            sizes = np.array([len(item) for item in shingles], dtype=np.int64)
+            if not sizes.any():
+                continue
+            hashes = np.array([int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+                               for item in shingles for shingle in item], dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+            nonempty = np.flatnonzero(sizes)
+            offsets = (np.cumsum(sizes) - sizes)[nonempty]
+            signatures[start + nonempty] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        return signatures
+
+    def _shingles(self, title: str) -> set:
+        tokens = _WORD.findall(title.casefold())
+        if len(tokens) < self.shingle_size:
+            return {" ".join(tokens)} if tokens else set()
+        return {" ".join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)}
+
+    @staticmethod
+    def _exact_keys(news: ArticleView) -> Tuple[Optional[str], Optional[str]]:
+        url = (news.get('url') or '').strip().rstrip('/').lower()
+        content = " ".join(_WORD.findall((news.get('title', '') + ' ' + news.get('content', '')).casefold()))
+        return ("url:" + url if url else None,
+                hashlib.sha1(content.encode("utf-8")).hexdigest() if content else None)
@@ -0,0 +1,135 @@
+from typing import List, Optional
+import argparse
+import logging
+import os
+import shutil
+import sys
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class SentenceTransformerBackend:
+    name = "torch"
+
+    def __init__(self, model_name: str, batch_size: int = 64, threads: int = 0):
+        from sentence_transformers import SentenceTransformer
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+        self.batch_size = batch_size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return _normalize(self.model.encode(texts, batch_size=self.batch_size))
+
+
+class OnnxEmbeddingBackend:
+    name = "onnx-int8"
+
+    def __init__(self, model_name: str, model_dir: str, batch_size: int = 64, threads: int = 0,
+                 max_length: int = 256):
+        model_path = os.path.join(model_dir, "model.int8.onnx")
+        if not os.path.exists(model_path):
+            # exporting needs torch, which this backend exists to keep out of the server
+            raise FileNotFoundError(f"ONNX model not found at {model_path}; export it first with "
+                                    f"`python -m app.services.embedding_backend --export`")
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.max_length = max_length
+        logger.info(f"⚡ ONNX Runtime эмбеддинги: {model_path}, потоков {threads or 'по умолчанию'}")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # sort by length so each batch pads to a similar size
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        batches = []
+        for start in range(0, len(order), self.batch_size):
+            batch = [texts[idx] for idx in order[start:start + self.batch_size]]
+            tokens = self.tokenizer(batch, padding=True, truncation=True, max_length=self.max_length,
+                                    return_tensors="np")
+            feeds = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+            hidden = self.session.run(None, feeds)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9))
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.vstack(batches)
+        return _normalize(embeddings)
+
+
+def export_quantized_onnx(model_name: str, model_dir: str, opset: int = 14) -> str:
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from transformers import AutoModel, AutoTokenizer
+
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    # build next to the target and swap the directory in whole, so a reader never sees a partial model
+    tmp_dir = f"{model_dir.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    float_path = os.path.join(tmp_dir, "model.onnx")
+    int8_path = os.path.join(tmp_dir, "model.int8.onnx")
+    logger.info(f"📤 Экспортируем {repo} в ONNX: {model_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(repo)
+    model = AutoModel.from_pretrained(repo).eval()
+    sample = tokenizer(["radar export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[name] for name in input_names), float_path,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=opset)
+    quantize_dynamic(float_path, int8_path, weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(tmp_dir)
+
+    if os.path.exists(model_dir):
+        shutil.rmtree(model_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(model_dir)), exist_ok=True)
+    os.rename(tmp_dir, model_dir)
+    model_path = os.path.join(model_dir, "model.int8.onnx")
+    logger.info(f"✅ Квантованная модель сохранена: {model_path}")
+    return model_path
+
+
+def create_embedding_backend(backend: Optional[str] = None):
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        return OnnxEmbeddingBackend(settings.SENTENCE_MODEL, settings.ONNX_MODEL_DIR,
+                                    batch_size=settings.EMBEDDING_BATCH_SIZE, threads=settings.EMBEDDING_THREADS)
+    return SentenceTransformerBackend(settings.SENTENCE_MODEL, batch_size=settings.EMBEDDING_BATCH_SIZE,
+                                      threads=settings.EMBEDDING_THREADS)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Offline tooling for the ONNX embedding backend")
+    parser.add_argument("--export", action="store_true", help="export and int8-quantize SENTENCE_MODEL")
+    parser.add_argument("--model", default=settings.SENTENCE_MODEL)
+    parser.add_argument("--model-dir", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args(argv)
+    if not args.export:
+        parser.error("nothing to do, pass --export")
+    export_quantized_onnx(args.model, args.model_dir, opset=args.opset)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main(sys.argv[1:])
@@ -0,0 +1,112 @@
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+import numpy as np
+import hashlib
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, max_size: int = 50000, path: Optional[str] = None, storage: str = "float16"):
+        if storage not in ("float16", "int8"):
+            raise ValueError(f"Unsupported embedding storage: {storage}")
+        self.model_name = model_name
+        self.storage = storage
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.path:
+            self.load()
+
+    def key(self, text: str) -> bytes:
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def lookup(self, texts: List[str]) -> Tuple[List[bytes], List[Optional[np.ndarray]]]:
+        keys = [self.key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    vector = self._decode(vector)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                vectors.append(vector)
+        return keys, vectors
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._entries[key] = self._encode(vector)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def _encode(self, vector: np.ndarray) -> np.ndarray:
+        if self.storage == "int8":
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+            return np.round(vector * 127).astype(np.int8)
+        return np.asarray(vector, dtype=np.float16)
+
+    def _decode(self, vector: np.ndarray) -> np.ndarray:
+        if vector.dtype == np.int8:
+            return vector.astype(np.float32) / 127
+        return vector
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name or data["vectors"].dtype != np.dtype(self.storage):
+                    logger.info(f"♻️ Кэш эмбеддингов {self.path} построен для другой модели, пропускаем")
+                    return
+                keys = data["keys"]
+                vectors = data["vectors"]
+            with self._lock:
+                for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+                    self._entries[key.tobytes()] = vector
+            logger.info(f"💾 Загружено {len(self._entries)} эмбеддингов из {self.path}")
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"⚠️ Не удалось загрузить кэш эмбеддингов {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            if not self._entries:
+                return
+            keys = np.frombuffer(b"".join(self._entries.keys()), dtype=np.uint8).reshape(len(self._entries), -1)
+            vectors = np.stack(list(self._entries.values())).astype(self.storage)
+            self._dirty = False
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # one temp file per writer process so concurrent saves never interleave
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, model=np.array(self.model_name), keys=keys, vectors=vectors)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось сохранить кэш эмбеддингов {self.path}: {e}")
@@ -0,0 +1,156 @@
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import functools
+import asyncio
+import logging
+import numpy as np
+from app.core.config import settings
+from app.services.processor import NewsProcessor
+from app.services.ranker import NewsRanker
+from app.services.article_batch import ArticleBatch
+from app.core.metrics import EXECUTOR_PENDING
+
+logger = logging.getLogger(__name__)
+
+_worker_processor: Optional[NewsProcessor] = None
+_worker_ranker: Optional[NewsRanker] = None
+
+
+class ExecutorOverloadedError(Exception):
+    pass
+
+
+def _init_worker():
+    global _worker_processor, _worker_ranker
+    # the parent keeps the persistent embedding cache and the cluster state
+    settings.EMBEDDING_CACHE_PATH = ""
+    _worker_processor = NewsProcessor()
+    _worker_processor.warm_up()
+    _worker_ranker = NewsRanker()
+    logger.info(f"👷 Воркер {multiprocessing.current_process().name} загрузил модели")
+
+
+def _ping() -> bool:
+    return True
+
+
+def _process_news(raw_news: List[Dict[str, Any]], window_start: Optional[datetime],
+                  embeddings: Optional[np.ndarray] = None, processor: Optional[NewsProcessor] = None,
+                  live: bool = True, collapsed: Optional[tuple] = None) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    timings: Dict[str, float] = {}
+    clusters = (processor or _worker_processor).process_news(raw_news, window_start, timings, embeddings, live,
+                                                             collapsed)
+    return clusters, timings
+
+
+def _annotate(batch: ArticleBatch, rows: List[int], encode_rows: List[int]
+              ) -> Tuple[Tuple[List[List[str]], List[Optional[List[str]]], np.ndarray], Dict[str, float]]:
+    timings: Dict[str, float] = {}
+    return _worker_processor.annotate(batch, rows, encode_rows, timings), timings
+
+
+def _embed(raw_news: List[Dict[str, Any]]) -> np.ndarray:
+    return _worker_processor.embed(raw_news)
+
+
+def _rank_clusters(clusters: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    return _worker_ranker.rank_clusters(clusters, top_k)
+
+
+def _rank_horizons(clusters: List[Dict[str, Any]], trends: Dict[int, Dict[str, np.ndarray]],
+                   top_k: Optional[int] = None) -> Dict[int, List[Dict[str, Any]]]:
+    return _worker_ranker.rank_horizons(clusters, trends, top_k)
+
+
+class StageExecutor:
+    def __init__(self, processor: NewsProcessor, ranker: NewsRanker, mode: Optional[str] = None):
+        self.processor = processor
+        self.ranker = ranker
+        self.mode = mode or settings.WORKER_POOL_MODE
+        self.max_workers = settings.WORKER_POOL_SIZE
+        self.max_pending = settings.WORKER_QUEUE_DEPTH
+        self._pending = 0
+        self.ready = False
+        if self.mode == "process":
+            self._pool: Executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="radar-stage")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise ExecutorOverloadedError(f"Очередь обработки заполнена ({self._pending}/{self.max_pending})")
+        self._pending += 1
+        EXECUTOR_PENDING.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args))
+        finally:
+            self._pending -= 1
+            EXECUTOR_PENDING.dec()
+
+    async def process_news(self, raw_news: List[Dict[str, Any]], window_start: Optional[datetime] = None,
+                           embeddings: Optional[np.ndarray] = None, live: bool = True
+                           ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        if self.mode != "process":
+            return await self.run(_process_news, raw_news, window_start, embeddings, self.processor, live)
+        if not len(raw_news):
+            return [], {}
+
+        # workers run NER and encoding; dedup and clustering stay in this process so evt_<n> ids are global
+        # and only the unique stories are sent for the expensive stages
+        timings: Dict[str, float] = {}
+        batch = raw_news if isinstance(raw_news, ArticleBatch) else ArticleBatch.from_dicts(raw_news)
+        collapsed = await asyncio.to_thread(self.processor.collapse, batch, timings)
+        rows = [news.row for news in collapsed[0]]
+        if embeddings is None:
+            keys, vectors, missing = self.processor.lookup_embeddings(collapsed[0])
+            (entities, tickers, encoded), worker_timings = await self.run(
+                _annotate, batch, rows, [rows[idx] for idx in missing])
+            timings.update(worker_timings)
+            batch.entities, batch.tickers = entities, tickers
+            embeddings = self.processor.complete_embeddings(keys, vectors, missing, encoded)
+        else:
+            embeddings = embeddings[rows]
+        clusters, cluster_timings = await asyncio.to_thread(
+            _process_news, batch, window_start, embeddings, self.processor, live, collapsed)
+        timings.update(cluster_timings)
+        return clusters, timings
+
+    async def embed(self, raw_news: List[Dict[str, Any]]) -> np.ndarray:
+        if self.mode == "process":
+            return await self.run(_embed, raw_news)
+        return await self.run(self.processor.embed, raw_news)
+
+    async def rank_clusters(self, clusters: List[Dict[str, Any]], top_k: Optional[int] = None
+                            ) -> List[Dict[str, Any]]:
+        if self.mode == "process":
+            return await self.run(_rank_clusters, clusters, top_k)
+        return await self.run(self.ranker.rank_clusters, clusters, top_k)
+
+    async def rank_horizons(self, clusters: List[Dict[str, Any]], trends: Dict[int, Dict[str, np.ndarray]],
+                            top_k: Optional[int] = None) -> Dict[int, List[Dict[str, Any]]]:
+        if self.mode == "process":
+            return await self.run(_rank_horizons, clusters, trends, top_k)
+        return await self.run(self.ranker.rank_horizons, clusters, trends, top_k)
+
+    async def warm_up(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.max_workers)))
+            logger.info(f"👷 Пул из {self.max_workers} процессов готов")
+        else:
+            await loop.run_in_executor(self._pool, self.processor.warm_up)
+        self.ready = True
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
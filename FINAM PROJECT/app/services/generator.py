@@ -1,8 +1,12 @@
-from typing import Dict, Any
-from app.models.schemas import NewsEvent, Source, Timeline
+from typing import Dict, Any, List
+from collections import OrderedDict
+from app.models.schemas import NewsEvent, Source, Timeline, EventSkeleton
+import asyncio
+import hashlib
 import openai
 import logging
 from app.core.config import settings
+from app.core.metrics import track_stage, record_cache, LLM_FAILURES
 
 logger = logging.getLogger(__name__)
 
@@ -10,12 +14,79 @@ openai.api_key = settings.LLM_API_KEY
 
 
 class DraftGenerator:
-    @staticmethod
-    async def generate_event(ranked_cluster: Dict[str, Any]) -> NewsEvent:
+    def __init__(self):
+        self._semaphore = asyncio.Semaphore(settings.LLM_CONCURRENCY)
+        self._draft_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._pending: Dict[str, "asyncio.Future[Dict[str, str]]"] = {}
+
+    async def generate_events(self, ranked_clusters: List[Dict[str, Any]]) -> List[NewsEvent]:
+        return list(await asyncio.gather(*(self.generate_event(cluster) for cluster in ranked_clusters)))
+
+    async def generate_event(self, ranked_cluster: Dict[str, Any]) -> NewsEvent:
         cluster = ranked_cluster['cluster']['cluster']
         hotness = ranked_cluster['hotness']
         entities = ranked_cluster['cluster']['entities']
 
+        draft = await self._get_draft(cluster, entities)
+
+        return NewsEvent(
+            headline=draft['headline'],
+            hotness=hotness,
+            why_now=draft['why_now'],
+            entities=entities,
+            sources=self._build_sources(cluster),
+            timeline=self._build_timeline(cluster),
+            draft=draft,
+            dedup_group=ranked_cluster['cluster']['cluster_id'],
+            trend=ranked_cluster.get('trend')
+        )
+
+    def build_skeleton(self, rank: int, ranked_cluster: Dict[str, Any]) -> EventSkeleton:
+        cluster = ranked_cluster['cluster']['cluster']
+        return EventSkeleton(
+            rank=rank,
+            dedup_group=ranked_cluster['cluster']['cluster_id'],
+            hotness=ranked_cluster['hotness'],
+            entities=ranked_cluster['cluster']['entities'],
+            sources=self._build_sources(cluster),
+            timeline=self._build_timeline(cluster),
+            trend=ranked_cluster.get('trend')
+        )
+
+    @staticmethod
+    def _build_sources(cluster: List[Dict[str, Any]]) -> List[Source]:
+        return [Source(
+            url=news['url'],
+            source_name=news['source'],
+            published_at=news['published_at'],
+            type='duplicate' if news.get('duplicate_of') else 'original'
+        ) for news in cluster]
+
+    @staticmethod
+    def _build_timeline(cluster: List[Dict[str, Any]]) -> Timeline:
+        return Timeline(
+            first_mention=min(news['published_at'] for news in cluster),
+            last_update=max(news['published_at'] for news in cluster)
+        )
+
+    async def _get_draft(self, cluster: List[Dict[str, Any]], entities: List[str]) -> Dict[str, str]:
+        fingerprint = self._fingerprint(cluster)
+        cached = self._draft_cache.get(fingerprint)
+        if cached is not None:
+            self._draft_cache.move_to_end(fingerprint)
+            record_cache("drafts", hits=1)
+            return dict(cached)
+        # the same cluster can rank in several horizons at once; share one LLM call
+        pending = self._pending.get(fingerprint)
+        if pending is not None:
+            record_cache("drafts", hits=1)
+            return dict(await asyncio.shield(pending))
+        record_cache("drafts", misses=1)
+        pending = self._pending[fingerprint] = asyncio.ensure_future(self._draft(fingerprint, cluster, entities))
+        pending.add_done_callback(lambda _: self._pending.pop(fingerprint, None))
+        return dict(await asyncio.shield(pending))
+
+    async def _draft(self, fingerprint: str, cluster: List[Dict[str, Any]], entities: List[str]) -> Dict[str, str]:
         prompt = f"""
         Создай финансовое событие на основе этих новостей:
         {', '.join([n['title'] for n in cluster[:3]])}
@@ -25,37 +96,31 @@ class DraftGenerator:
         """
 
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=settings.LLM_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=150
-            )
-            llm_text = response.choices[0].message.content
+            async with self._semaphore:
+                with track_stage("llm"):
+                    llm_text = await asyncio.wait_for(self._complete(prompt), timeout=settings.LLM_TIMEOUT)
             draft = {"headline": llm_text[:50] + "...",
                      "why_now": llm_text[50:100] + "..."}  # Простой парсинг; улучши json.loads в prod
         except Exception as e:
-            logger.error(f"LLM ошибка: {e}")
-            draft = {"headline": cluster[0]['title'], "why_now": "Hot event detected"}
+            LLM_FAILURES.labels("timeout" if isinstance(e, asyncio.TimeoutError) else "error").inc()
+            logger.error(f"LLM ошибка: {e!r}")
+            return {"headline": cluster[0]['title'], "why_now": "Hot event detected"}
 
-        sources = [Source(
-            url=news['url'],
-            source_name=news['source'],
-            published_at=news['published_at'],
-            type='original'
-        ) for news in cluster]
+        self._draft_cache[fingerprint] = draft
+        while len(self._draft_cache) > settings.LLM_DRAFT_CACHE_SIZE:
+            self._draft_cache.popitem(last=False)
+        return draft
 
-        timeline = Timeline(
-            first_mention=min(news['published_at'] for news in cluster),
-            last_update=max(news['published_at'] for news in cluster)
+    @staticmethod
+    async def _complete(prompt: str) -> str:
+        response = await openai.ChatCompletion.acreate(
+            model=settings.LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=150
         )
+        return response.choices[0].message.content
 
-        return NewsEvent(
-            headline=draft['headline'],
-            hotness=hotness,
-            why_now=draft['why_now'],
-            entities=entities,
-            sources=sources,
-            timeline=timeline,
-            draft=draft,
-            dedup_group=ranked_cluster['cluster']['cluster_id']
-        )
\ No newline at end of file
+    @staticmethod
+    def _fingerprint(cluster: List[Dict[str, Any]]) -> str:
+        member_ids = sorted(str(news['id']) for news in cluster)
+        return hashlib.sha1("\n".join(member_ids).encode("utf-8")).hexdigest()
@@ -0,0 +1,207 @@
+from typing import Dict, Any, Optional, Tuple, Callable
+from collections import OrderedDict
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+import uuid
+from app.models.schemas import TimeWindow, RadarResponse, AnalysisJobStatus
+from app.services.pipeline import RadarPipeline
+from app.services.snapshot import SnapshotReader
+from app.services.response_cache import EncodedResponse
+from app.core.config import settings
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJob:
+    def __init__(self, key: str, time_window: TimeWindow):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.time_window = time_window
+        self.status = "pending"
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[RadarResponse] = None
+        self.error: Optional[BaseException] = None
+        self.done = asyncio.Event()
+
+    def to_status(self) -> AnalysisJobStatus:
+        return AnalysisJobStatus(
+            job_id=self.id,
+            status=self.status,
+            window_key=self.key,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            result=self.result,
+            error=str(self.error) if self.error else None
+        )
+
+
+class AnalysisJobManager:
+    def __init__(self, pipeline: RadarPipeline, snapshot: Optional[SnapshotReader] = None):
+        self.pipeline = pipeline
+        self.snapshot = snapshot
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._in_flight: Dict[str, AnalysisJob] = {}
+        self._results: "OrderedDict[str, Tuple[RadarResponse, float]]" = OrderedDict()
+        self._encoded: "OrderedDict[str, EncodedResponse]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def window_key(time_window: TimeWindow) -> str:
+        horizons = "".join(f"+{hours}h" for hours in sorted(set(time_window.horizons or [])))
+        if not time_window.start_time and not time_window.end_time:
+            return f"last_{time_window.hours}h{horizons}"
+        bucket = settings.RESULT_CACHE_BUCKET_SECONDS
+
+        def floor(dt: Optional[datetime]) -> str:
+            return str(int(dt.timestamp() // bucket * bucket)) if dt else "now"
+
+        return f"{floor(time_window.start_time)}-{floor(time_window.end_time)}-{time_window.hours}h{horizons}"
+
+    @classmethod
+    def result_ttl(cls, time_window: TimeWindow) -> float:
+        if time_window.end_time is not None:
+            return settings.RESULT_CACHE_TTL
+        # only the scheduled window is refreshed in the background; other windows ending "now" go stale
+        # as the window slides, so they must not outlive one key bucket
+        if cls.window_key(time_window) == cls.window_key(TimeWindow(hours=settings.SCHEDULER_WINDOW_HOURS)):
+            return settings.RESULT_CACHE_TTL
+        return min(settings.RESULT_CACHE_TTL, settings.RESULT_CACHE_BUCKET_SECONDS)
+
+    def get_cached(self, key: str) -> Optional[RadarResponse]:
+        cached = self._results.get(key)
+        if cached and cached[1] > time.monotonic():
+            self._results.move_to_end(key)
+            record_cache("results", hits=1)
+            return cached[0]
+        published = self.snapshot.result(key) if self.snapshot else None
+        if published:
+            result = RadarResponse.model_validate(published["response"])
+            self._store_result(key, result, time.monotonic() + published["expires_at"] - time.time())
+            record_cache("results", hits=1)
+            return result
+        record_cache("results", misses=1)
+        return None
+
+    def get_encoded(self, key: str) -> Optional[EncodedResponse]:
+        encoded = self._encoded.get(key)
+        if encoded and encoded.fresh:
+            self._encoded.move_to_end(key)
+            record_cache("results", hits=1)
+            return encoded
+        now = time.monotonic()
+        cached = self._results.get(key)
+        if cached and cached[1] > now:
+            record_cache("results", hits=1)
+            return self._store_encoded(key, cached[0].model_dump(mode="json"), cached[1])
+        published = self.snapshot.result(key) if self.snapshot else None
+        if published:
+            # published responses are already plain JSON; skip model validation on the polling path
+            record_cache("results", hits=1)
+            return self._store_encoded(key, published["response"], now + published["expires_at"] - time.time())
+        record_cache("results", misses=1)
+        return None
+
+    def _store_encoded(self, key: str, payload: Any, expires_at: float) -> EncodedResponse:
+        encoded = self._encoded[key] = EncodedResponse.from_payload(payload, expires_at)
+        self._encoded.move_to_end(key)
+        self._prune(self._encoded, lambda entry: entry.expires_at)
+        return encoded
+
+    def _store_result(self, key: str, result: RadarResponse, expires_at: float) -> None:
+        self._results[key] = (result, expires_at)
+        self._results.move_to_end(key)
+        self._prune(self._results, lambda entry: entry[1])
+
+    @staticmethod
+    def _prune(cache: "OrderedDict[str, Any]", expires_at: Callable[[Any], float]) -> None:
+        now = time.monotonic()
+        for key in [key for key, entry in cache.items() if expires_at(entry) <= now]:
+            del cache[key]
+        while len(cache) > settings.RESULT_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+    def export_results(self) -> Dict[str, Dict[str, Any]]:
+        now_wall, now_monotonic = time.time(), time.monotonic()
+        return {
+            key: {"expires_at": now_wall + expires - now_monotonic, "response": result.model_dump(mode="json")}
+            for key, (result, expires) in self._results.items() if expires > now_monotonic
+        }
+
+    def get_job(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, time_window: TimeWindow, force: bool = False) -> AnalysisJob:
+        self._evict_finished_jobs()
+        key = self.window_key(time_window)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight:
+            return in_flight
+
+        job = AnalysisJob(key, time_window)
+        self._jobs[job.id] = job
+        cached = None if force else self.get_cached(key)
+        if cached:
+            self._finish(job, result=cached)
+            return job
+
+        self._in_flight[key] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        return job
+
+    async def wait(self, job: AnalysisJob, timeout: Optional[float] = None) -> AnalysisJob:
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def run(self, time_window: TimeWindow) -> EncodedResponse:
+        key = self.window_key(time_window)
+        encoded = self.get_encoded(key)
+        if encoded:
+            return encoded
+        job = await self.wait(self.submit(time_window, force=True))
+        if job.error:
+            raise job.error
+        return self._encoded.get(key) or EncodedResponse.from_payload(job.result.model_dump(mode="json"))
+
+    async def refresh(self, time_window: TimeWindow) -> None:
+        job = await self.wait(self.submit(time_window, force=True))
+        if job.error:
+            logger.error(f"❌ Плановое обновление {job.key} не удалось: {job.error}")
+        else:
+            logger.info(f"🕐 Кэш {job.key} обновлён: {len(job.result.top_events)} событий")
+
+    async def _run(self, job: AnalysisJob) -> None:
+        job.status = "running"
+        try:
+            result = await self.pipeline.process_time_window(job.time_window)
+            expires_at = time.monotonic() + self.result_ttl(job.time_window)
+            self._store_result(job.key, result, expires_at)
+            self._store_encoded(job.key, result.model_dump(mode="json"), expires_at)
+            self._finish(job, result=result)
+        except Exception as e:
+            self._finish(job, error=e)
+        finally:
+            self._in_flight.pop(job.key, None)
+            self._tasks.pop(job.id, None)
+
+    @staticmethod
+    def _finish(job: AnalysisJob, result: Optional[RadarResponse] = None,
+                error: Optional[BaseException] = None) -> None:
+        job.result = result
+        job.error = error
+        job.status = "failed" if error else "done"
+        job.finished_at = datetime.now(timezone.utc)
+        job.done.set()
+
+    def _evict_finished_jobs(self) -> None:
+        now = datetime.now(timezone.utc)
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and (now - job.finished_at).total_seconds() > settings.JOB_RETENTION_SECONDS:
+                del self._jobs[job_id]
@@ -0,0 +1,96 @@
+from typing import List, Dict, Optional, Protocol, Tuple
+import json
+import logging
+import threading
+import time
+import yfinance as yf
+from app.core.config import settings
+from app.core.metrics import record_cache, MARKET_DATA_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataBackend(Protocol):
+    def fetch_changes(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        ...
+
+
+class YahooMarketDataBackend:
+    def fetch_changes(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        data = yf.download(tickers, period='5d', group_by='ticker', progress=False, threads=True)
+        changes: Dict[str, Optional[float]] = {}
+        for ticker in tickers:
+            try:
+                closes = (data[ticker]['Close'] if len(tickers) > 1 else data['Close']).dropna()
+                if len(closes) >= 2:
+                    changes[ticker] = float((closes.iloc[-1] - closes.iloc[-2]) / closes.iloc[-2])
+                else:
+                    changes[ticker] = None
+            except (ValueError, KeyError, IndexError) as e:
+                MARKET_DATA_ERRORS.inc()
+                logger.warning(f"yfinance ошибка для {ticker}: {e}")
+                changes[ticker] = None
+        return changes
+
+
+class FixtureMarketDataBackend:
+    def __init__(self, changes: Optional[Dict[str, float]] = None, path: Optional[str] = None, latency: float = 0.0):
+        self.changes = dict(changes or {})
+        self.latency = latency
+        if path:
+            with open(path, encoding="utf-8") as f:
+                self.changes.update(json.load(f))
+
+    def fetch_changes(self, tickers: List[str]) -> Dict[str, Optional[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return {ticker: self.changes.get(ticker) for ticker in tickers}
+
+
+class MarketDataProvider:
+    def __init__(self, backend: MarketDataBackend, ttl: float = 300.0, negative_ttl: float = 3600.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache: Dict[str, Tuple[Optional[float], float]] = {}
+        self._lock = threading.Lock()
+
+    def get_changes(self, tickers: List[str]) -> Dict[str, float]:
+        now = time.monotonic()
+        changes: Dict[str, float] = {}
+        missing: List[str] = []
+        unique_tickers = list(dict.fromkeys(tickers))
+        with self._lock:
+            for ticker in unique_tickers:
+                cached = self._cache.get(ticker)
+                if cached and cached[1] > now:
+                    if cached[0] is not None:
+                        changes[ticker] = cached[0]
+                else:
+                    missing.append(ticker)
+
+        record_cache("market_data", hits=len(unique_tickers) - len(missing), misses=len(missing))
+        if missing:
+            try:
+                fetched = self.backend.fetch_changes(missing)
+            except Exception as e:
+                MARKET_DATA_ERRORS.inc()
+                logger.warning(f"⚠️ Не удалось получить котировки для {len(missing)} тикеров: {e}")
+                return changes
+            with self._lock:
+                for ticker in missing:
+                    change = fetched.get(ticker)
+                    self._cache[ticker] = (change, now + (self.ttl if change is not None else self.negative_ttl))
+                    if change is not None:
+                        changes[ticker] = change
+            logger.info(f"💹 Котировки: {len(missing)} тикеров запрошено одним батчем, "
+                        f"{len(unique_tickers) - len(missing)} из кэша")
+        return changes
+
+
+def create_market_data_provider() -> MarketDataProvider:
+    if settings.MARKET_DATA_BACKEND == "fixture":
+        backend: MarketDataBackend = FixtureMarketDataBackend(path=settings.MARKET_DATA_FIXTURE_PATH or None)
+    else:
+        backend = YahooMarketDataBackend()
+    return MarketDataProvider(backend, ttl=settings.MARKET_DATA_TTL, negative_ttl=settings.MARKET_DATA_NEGATIVE_TTL)
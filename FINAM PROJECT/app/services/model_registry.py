@@ -0,0 +1,82 @@
+from typing import Dict, Any, Callable
+from functools import lru_cache
+import logging
+import threading
+import time
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _load_sentence_model():
+    from app.services.embedding_backend import create_embedding_backend
+    return create_embedding_backend()
+
+
+def _load_spacy():
+    import spacy
+    try:
+        nlp = spacy.load(settings.SPACY_MODEL)
+    except OSError:
+        logger.warning(
+            f"⚠️ Модель spaCy '{settings.SPACY_MODEL}' не найдена. Установите: python -m spacy download {settings.SPACY_MODEL}")
+        return None
+    nlp.select_pipes(disable=[pipe for pipe in settings.SPACY_DISABLE if pipe in nlp.pipe_names])
+    return nlp
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {
+            "sentence": _load_sentence_model,
+            "spacy": _load_spacy,
+        }
+        self._models: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks = {name: threading.Lock() for name in self._loaders}
+
+    def get(self, name: str) -> Any:
+        if name in self._models:
+            return self._models[name]
+        with self._locks[name]:
+            if name not in self._models:
+                start = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_seconds[name] = time.perf_counter() - start
+                self._errors.pop(name, None)
+                logger.info(f"📦 Модель '{name}' загружена за {self._load_seconds[name]:.1f}s")
+        return self._models[name]
+
+    def sentence_model(self):
+        return self.get("sentence")
+
+    def nlp(self):
+        return self.get("spacy")
+
+    def load_all(self) -> None:
+        for name in self._loaders:
+            self.get(name)
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._models for name in self._loaders)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": round(self._load_seconds[name], 3) if name in self._load_seconds else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+@lru_cache(maxsize=1)
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry()
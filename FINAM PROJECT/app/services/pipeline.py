@@ -1,56 +1,228 @@
 import time
+import asyncio
 import logging
-from typing import List
-from app.models.schemas import TimeWindow, RadarResponse, NewsEvent
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from functools import lru_cache
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.models.schemas import TimeWindow, RadarResponse, NewsEvent, HorizonRanking
 from app.services.collector import NewsCollector
 from app.services.processor import NewsProcessor
 from app.services.ranker import NewsRanker
 from app.services.generator import DraftGenerator
+from app.services.executor import StageExecutor
+from app.services.snapshot import SnapshotReader, SnapshotWriter, get_snapshot_reader
+from app.services.trends import TrendTracker
 from app.core.config import settings
+from app.core.metrics import track_stage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RadarPipeline:
-    def __init__(self):
+    def __init__(self, snapshot: Optional[SnapshotReader] = None):
+        self.snapshot = snapshot
         self.collector = NewsCollector()
-        self.processor = NewsProcessor()
+        self.processor = NewsProcessor(snapshot_mode=snapshot is not None)
         self.ranker = NewsRanker()
         self.generator = DraftGenerator()
+        # snapshot readers only cluster and rank precomputed data; a process pool would load the models per worker
+        self.executor = StageExecutor(self.processor, self.ranker, mode="thread" if snapshot else None)
+        self.trends = TrendTracker(settings.TREND_BUCKET_SECONDS, settings.TREND_HISTORY_HOURS)
 
-    async def process_time_window(self, time_window: TimeWindow) -> RadarResponse:
-        start_time = time.time()
+    @property
+    def ready(self) -> bool:
+        if self.snapshot:
+            return self.snapshot.ready
+        return self.executor.ready or (self.executor.mode != "process" and self.processor.models.ready)
 
+    async def warm_up(self) -> None:
+        start_time = time.time()
         try:
-            logger.info("📡 Собираем новости...")
-            raw_news = await self.collector.collect_news(time_window)
-            logger.info(f"📊 Собрано {len(raw_news)} новостей")
-
-            logger.info("🔧 Обрабатываем и дедуплицируем...")
-            news_clusters = self.processor.process_news(raw_news)
-            logger.info(f"📦 Получено {len(news_clusters)} кластеров")
-
-            logger.info("🎯 Ранжируем по горячести...")
-            ranked_clusters = self.ranker.rank_clusters(news_clusters)
+            await self.executor.warm_up()
+        except Exception as e:
+            logger.error(f"❌ Не удалось прогреть модели: {e}")
+            return
+        logger.info(f"🔥 Модели прогреты за {time.time() - start_time:.1f}s")
 
-            top_clusters = ranked_clusters[:settings.TOP_K_EVENTS]
+    async def process_time_window(self, time_window: TimeWindow) -> RadarResponse:
+        start_time = time.time()
+        timings: Dict[str, float] = {}
 
-            logger.info("✍️ Генерируем черновики...")
-            news_events: List[NewsEvent] = []
+        try:
+            with track_stage("pipeline"):
+                hot_clusters, horizon_clusters = await self._rank_time_window(time_window, timings)
 
-            for cluster in top_clusters:
-                if cluster['hotness'] >= settings.HOTNESS_THRESHOLD:
-                    event = await self.generator.generate_event(cluster)
-                    news_events.append(event)
+                logger.info("✍️ Генерируем черновики...")
+                with track_stage("generate", timings):
+                    news_events, *horizon_events = await asyncio.gather(
+                        self.generator.generate_events(hot_clusters),
+                        *(self.generator.generate_events(ranked) for ranked in horizon_clusters.values()))
 
             processing_time = time.time() - start_time
+            logger.info("⏱️ Этапы: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
 
             return RadarResponse(
                 time_window=time_window,
                 top_events=news_events,
-                processing_time=processing_time
+                processing_time=processing_time,
+                horizons=[HorizonRanking(horizon_hours=hours, top_events=events)
+                          for hours, events in zip(horizon_clusters, horizon_events)] if time_window.horizons else None,
+                stage_timings=self._report_timings(timings)
             )
 
         except Exception as e:
             logger.error(f"❌ Ошибка в пайплайне: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def stream_time_window(self, time_window: TimeWindow) -> AsyncIterator[Dict[str, Any]]:
+        start_time = time.time()
+        timings: Dict[str, float] = {}
+
+        try:
+            with track_stage("pipeline"):
+                hot_clusters, horizon_clusters = await self._rank_time_window(time_window, timings)
+                skeleton = {
+                    "type": "skeleton",
+                    "time_window": time_window.model_dump(mode="json"),
+                    "clusters": [self.generator.build_skeleton(rank, cluster).model_dump(mode="json")
+                                 for rank, cluster in enumerate(hot_clusters)],
+                    "elapsed": time.time() - start_time
+                }
+                if time_window.horizons:
+                    skeleton["horizons"] = {
+                        str(hours): [self.generator.build_skeleton(rank, cluster).model_dump(mode="json")
+                                     for rank, cluster in enumerate(ranked)]
+                        for hours, ranked in horizon_clusters.items()
+                    }
+                yield skeleton
+
+                logger.info("✍️ Генерируем черновики (стрим)...")
+                tasks = [asyncio.create_task(self._generate_ranked(rank, cluster))
+                         for rank, cluster in enumerate(hot_clusters)]
+                tasks.extend(asyncio.create_task(self._generate_ranked(rank, cluster, hours))
+                             for hours, ranked in horizon_clusters.items() for rank, cluster in enumerate(ranked))
+                try:
+                    with track_stage("generate", timings):
+                        for next_event in asyncio.as_completed(tasks):
+                            rank, hours, event = await next_event
+                            frame = {
+                                "type": "event",
+                                "rank": rank,
+                                "event": event.model_dump(mode="json"),
+                                "elapsed": time.time() - start_time
+                            }
+                            if hours is not None:
+                                frame["horizon"] = hours
+                            yield frame
+                finally:
+                    for task in tasks:
+                        task.cancel()
+
+            yield {
+                "type": "summary",
+                "events": len(hot_clusters),
+                "processing_time": time.time() - start_time,
+                "stage_timings": self._report_timings(timings)
+            }
+
+        except Exception as e:
+            logger.error(f"❌ Ошибка в пайплайне: {e}")
+            raise
+
+    async def _rank_time_window(self, time_window: TimeWindow, timings: Dict[str, float]
+                                ) -> Tuple[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+        end_time = time_window.end_time or datetime.now(timezone.utc)
+        window_start = time_window.start_time or (datetime.now(timezone.utc) - timedelta(hours=time_window.hours))
+        horizons = sorted(set(time_window.horizons or []))
+        # one collection covers the main window and every requested horizon
+        collect_start = min([window_start, *(end_time - timedelta(hours=hours) for hours in horizons)])
+        collect_window = time_window if collect_start == window_start else \
+            time_window.model_copy(update={"start_time": collect_start})
+        if self.snapshot:
+            logger.info("📸 Читаем новости из снимка...")
+            with track_stage("snapshot", timings):
+                raw_news, embeddings = await asyncio.to_thread(self.snapshot.window, collect_start, end_time)
+        else:
+            logger.info("📡 Собираем новости...")
+            raw_news, embeddings = await self.collector.collect_news(collect_window, timings), None
+        logger.info(f"📊 Собрано {len(raw_news)} новостей")
+
+        logger.info("🔧 Обрабатываем и дедуплицируем...")
+        news_clusters, processing_timings = await self.executor.process_news(
+            raw_news, collect_start, embeddings, live=time_window.end_time is None)
+        timings.update(processing_timings)
+        logger.info(f"📦 Получено {len(news_clusters)} кластеров")
+        if not self.snapshot:
+            # saved once, after entities and tickers are attached
+            with track_stage("store", timings):
+                await self.collector.save_news([news for cluster in news_clusters for news in cluster['cluster']])
+
+        # live windows feed the shared ring buffers; historical ones get a throwaway tracker
+        tracker = self.trends if time_window.end_time is None else \
+            TrendTracker(settings.TREND_BUCKET_SECONDS, settings.TREND_HISTORY_HOURS)
+        with track_stage("trends", timings):
+            keys = await asyncio.to_thread(tracker.observe, news_clusters, int(end_time.timestamp()))
+
+        main_clusters = news_clusters
+        if collect_start < window_start:
+            cutoff = int(window_start.timestamp())
+            main_clusters = [restricted for restricted in
+                             (self._restrict(cluster, cutoff) for cluster in news_clusters)
+                             if restricted is not None]
+
+        logger.info("🎯 Ранжируем по горячести...")
+        horizon_clusters: Dict[int, List[Dict[str, Any]]] = {}
+        with track_stage("rank", timings):
+            top_clusters = await self.executor.rank_clusters(main_clusters, settings.TOP_K_EVENTS)
+            if horizons:
+                rankings = await self.executor.rank_horizons(
+                    news_clusters, tracker.horizons(keys, horizons), settings.TOP_K_EVENTS)
+                horizon_clusters = {hours: [cluster for cluster in ranked
+                                            if cluster['hotness'] >= settings.HOTNESS_THRESHOLD]
+                                    for hours, ranked in rankings.items()}
+
+        hot_clusters = [cluster for cluster in top_clusters if cluster['hotness'] >= settings.HOTNESS_THRESHOLD]
+        return hot_clusters, horizon_clusters
+
+    @staticmethod
+    def _restrict(cluster: Dict[str, Any], cutoff: int) -> Optional[Dict[str, Any]]:
+        # the horizon look-back widens the corpus; the main ranking only sees rows inside the window
+        members = cluster['cluster']
+        rows = members.rows[members.published >= cutoff]
+        if len(rows) == len(members):
+            return cluster
+        if not len(rows):
+            return None
+        batch = members.batch
+        return {
+            **cluster,
+            'size': len(rows),
+            'entities': list(set(ent for row in rows for ent in batch.entities[row])),
+            'tickers': [ticker for ticker, _ in
+                        Counter(t for row in rows for t in batch.tickers[row] or []).most_common()],
+            'cluster': batch.take(rows),
+        }
+
+    async def publish_snapshot(self, writer: SnapshotWriter, results: Dict[str, Dict[str, Any]]) -> str:
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=settings.SNAPSHOT_HOURS)
+        articles = await asyncio.to_thread(self.collector.store.query, start, end)
+        embeddings = await self.executor.embed(articles) if articles else np.zeros((0, 0), dtype=np.float16)
+        return await asyncio.to_thread(writer.write, articles, embeddings, results)
+
+    async def _generate_ranked(self, rank: int, cluster: Dict[str, Any], horizon: Optional[int] = None
+                               ) -> Tuple[int, Optional[int], NewsEvent]:
+        return rank, horizon, await self.generator.generate_event(cluster)
+
+    @staticmethod
+    def _report_timings(timings: Dict[str, float]) -> Optional[Dict[str, float]]:
+        if not settings.RESPONSE_STAGE_TIMINGS:
+            return None
+        return {stage: round(seconds, 4) for stage, seconds in timings.items()}
+
+
+@lru_cache(maxsize=1)
+def get_pipeline() -> RadarPipeline:
+    return RadarPipeline(get_snapshot_reader() if settings.DEPLOYMENT_MODE == "multi" else None)
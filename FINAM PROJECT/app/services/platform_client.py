@@ -1,103 +1,189 @@
 import aiohttp
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
 from app.models.schemas import TimeWindow
+from app.services.ticker_matcher import get_ticker_matcher
 from aiohttp_retry import RetryClient
 import logging
-import re
 
 logger = logging.getLogger(__name__)
 
+_DONE = object()
+
+
+class _RateLimiter:
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
 class PlatformClient:
     def __init__(self):
         self.api_key = settings.PLATFORM_API_KEY
         self.base_url = settings.PLATFORM_API_URL
         self.timeout = aiohttp.ClientTimeout(total=30)
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    async def __aenter__(self):
-        client_session = aiohttp.ClientSession(
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=self.timeout
-        )
-        self.session = RetryClient(client_session=client_session, retries=3)
+        self.session: Optional[RetryClient] = None
+        self._rate_limiters: Dict[str, _RateLimiter] = {}
+
+    async def start(self) -> "PlatformClient":
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_POOL_SIZE,
+                limit_per_host=settings.HTTP_POOL_PER_HOST,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300
+            )
+            # no Authorization here: the session is shared with third-party NEWS_SOURCES
+            client_session = aiohttp.ClientSession(
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+                connector=connector
+            )
+            self.session = RetryClient(client_session=client_session, retries=3)
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def close(self):
         if self.session:
             await self.session.close()
+            self.session = None
 
-    async def get_news(self, time_window: TimeWindow) -> List[Dict[str, Any]]:
-        if not self.session:
-            raise RuntimeError("Client not initialized. Use async context manager.")
+    async def __aenter__(self):
+        return await self.start()
 
-        try:
-            params = {
-                "start_time": time_window.start_time.isoformat() if time_window.start_time else
-                (datetime.now(timezone.utc) - timedelta(hours=time_window.hours)).isoformat(),
-                "end_time": time_window.end_time.isoformat() if time_window.end_time else
-                datetime.now(timezone.utc).isoformat(),
-                "limit": settings.MAX_NEWS_PER_SOURCE,
-                "language": "en,ru"
-            }
-
-            params = {k: v for k, v in params.items() if v is not None}
-
-            async with self.session.get(
-                    f"{self.base_url}/news",
-                    params=params
-            ) as response:
-
-                if response.status == 200:
-                    data = await response.json()
-                    return self._normalize_news_data(data)
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"API Error {response.status}: {error_text}")
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
+    async def get_news(self, time_window: TimeWindow) -> List[Dict[str, Any]]:
+        try:
+            return [news async for news in self.iter_news(time_window)]
+        except RuntimeError:
+            raise
         except asyncio.TimeoutError:
             raise Exception("Platform API timeout")
         except Exception as e:
             raise Exception(f"Failed to fetch news: {str(e)}")
 
-    def _normalize_news_data(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        normalized_news = []
+    async def iter_news(self, time_window: TimeWindow) -> AsyncIterator[Dict[str, Any]]:
+        if not self.session:
+            raise RuntimeError("Client not initialized. Call start() or use async context manager.")
+
+        params = {
+            "start_time": time_window.start_time.isoformat() if time_window.start_time else
+            (datetime.now(timezone.utc) - timedelta(hours=time_window.hours)).isoformat(),
+            "end_time": time_window.end_time.isoformat() if time_window.end_time else
+            datetime.now(timezone.utc).isoformat(),
+            "limit": settings.MAX_NEWS_PER_SOURCE,
+            "language": "en,ru"
+        }
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.MAX_NEWS_PER_SOURCE)
+        tasks = [asyncio.create_task(self._stream_source(self.base_url, params, queue, required=True))]
+        tasks.extend(asyncio.create_task(self._stream_source(source, params, queue, required=False))
+                     for source in settings.NEWS_SOURCES)
 
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                yield item
+            for task in tasks:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_source(self, base_url: str, params: Dict[str, Any], queue: asyncio.Queue, required: bool):
+        limiter = self._rate_limiters.setdefault(base_url, _RateLimiter(settings.NEWS_SOURCE_RATE_LIMIT))
+        try:
+            page = 1
+            while page <= settings.PLATFORM_MAX_PAGES:
+                wave = range(page, min(page + settings.PLATFORM_PAGE_CONCURRENCY, settings.PLATFORM_MAX_PAGES + 1))
+                results = await asyncio.gather(
+                    *(self._stream_page(base_url, {**params, "page": n}, queue, limiter) for n in wave),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                if any(count < settings.MAX_NEWS_PER_SOURCE for count in results):
+                    break
+                page += len(wave)
+        except Exception as e:
+            if required:
+                raise
+            logger.warning(f"⚠️ Источник {base_url} недоступен: {e}")
+        finally:
+            await queue.put(_DONE)
+
+    async def _stream_page(self, base_url: str, params: Dict[str, Any], queue: asyncio.Queue,
+                           limiter: _RateLimiter) -> int:
+        await limiter.acquire()
+        async with self.session.get(f"{base_url}/news", params=params, headers=self._auth_headers(base_url)) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise Exception(f"API Error {response.status}: {error_text}")
+            # pages are bounded by MAX_NEWS_PER_SOURCE, so parsing them whole is cheap
+            raw_data = await response.json(content_type=None)
+
+        news_items = self._normalize_news_data(raw_data) if isinstance(raw_data, dict) else []
+        for item in news_items:
+            await queue.put(item)
+        return len(news_items)
+
+    def _auth_headers(self, base_url: str) -> Dict[str, str]:
+        if base_url == self.base_url and self.api_key:
+            return {"Authorization": f"Bearer {self.api_key}"}
+        return {}
+
+    def _normalize_news_data(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         news_items = raw_data.get("articles", []) or raw_data.get("news", []) or raw_data.get("items", [])
+        return [self._normalize_item(item) for item in news_items]
+
+    def _normalize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        normalized = {
+            "id": item.get("id") or item.get("url") or hashlib.sha1(item.get("title", "").encode("utf-8")).hexdigest(),
+            "title": item.get("title", ""),
+            "content": item.get("content") or item.get("description") or item.get("text", ""),
+            "summary": item.get("summary", ""),
+            "published_at": self._parse_datetime(
+                item.get("published_at") or item.get("date") or item.get("timestamp")),
+            "url": item.get("url") or item.get("link", ""),
+            "source": self._source_name(item.get("source") or item.get("publisher")),
+            "author": item.get("author", ""),
+            "language": item.get("language", "en"),
+            "entities": item.get("entities", []),
+            "sentiment": item.get("sentiment"),
+            "category": item.get("category") or item.get("section", "")
+        }
+
+        text = normalized.get('title', '') + ' ' + normalized.get('content', '')
+        normalized['tickers'] = get_ticker_matcher().match(text)
+        normalized['entities'] = list(dict.fromkeys(list(normalized['entities']) + normalized['tickers']))
+
+        return {k: v for k, v in normalized.items() if v is not None}
 
-        for item in news_items:
-            normalized = {
-                "id": item.get("id") or item.get("url") or str(hash(item.get("title", ""))),
-                "title": item.get("title", ""),
-                "content": item.get("content") or item.get("description") or item.get("text", ""),
-                "summary": item.get("summary", ""),
-                "published_at": self._parse_datetime(
-                    item.get("published_at") or item.get("date") or item.get("timestamp")),
-                "url": item.get("url") or item.get("link", ""),
-                "source": item.get("source") or item.get("publisher", "unknown"),
-                "author": item.get("author", ""),
-                "language": item.get("language", "en"),
-                "entities": item.get("entities", []),
-                "sentiment": item.get("sentiment"),
-                "category": item.get("category") or item.get("section", "")
-            }
-
-            text = normalized.get('title', '') + ' ' + normalized.get('content', '')
-            tickers = re.findall(r'\b[A-Z]{1,5}\b', text)
-            if 'entities' in normalized:
-                normalized['entities'].extend(tickers)
-            else:
-                normalized['entities'] = list(set(tickers))
-
-            normalized = {k: v for k, v in normalized.items() if v is not None}
-            normalized_news.append(normalized)
-
-        return normalized_news
+    @staticmethod
+    def _source_name(source: Any) -> str:
+        # NewsAPI nests the publisher as {"id": ..., "name": ...}
+        if isinstance(source, dict):
+            source = source.get("name") or source.get("id")
+        return str(source) if source else "unknown"
 
     @staticmethod
     def _parse_datetime(dt_str: Any) -> datetime:
@@ -1,64 +1,246 @@
-from typing import List, Dict, Any
-import spacy
-from sentence_transformers import SentenceTransformer
+from typing import List, Dict, Any, Optional, Union, Sequence, Mapping, Tuple
+from collections import OrderedDict, Counter
+from datetime import datetime, timedelta
 from sklearn.cluster import DBSCAN
-import re
+import numpy as np
 import logging
+import threading
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.clustering import IncrementalClusterer
+from app.services.dedup import NearDuplicateFilter
+from app.services.article_batch import ArticleBatch, ArticleView
+from app.services.ticker_matcher import get_ticker_matcher
+from app.services.model_registry import get_model_registry
+from app.core.metrics import track_stage, record_cache, CLUSTERS_FORMED
 
 logger = logging.getLogger(__name__)
 
 
 class NewsProcessor:
-    def __init__(self):
-        self.sentence_model = SentenceTransformer(settings.SENTENCE_MODEL)
-        try:
-            self.nlp = spacy.load(settings.SPACY_MODEL)
-        except OSError:
-            logger.warning(
-                f"⚠️ Модель spaCy '{settings.SPACY_MODEL}' не найдена. Установите: python -m spacy download {settings.SPACY_MODEL}")
-            self.nlp = None
-
-    def process_news(self, raw_news: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        if not raw_news:
+    def __init__(self, snapshot_mode: bool = False):
+        self.models = get_model_registry()
+        # snapshot readers get embeddings with the data, so they never encode and never touch the cache file
+        self.embedding_cache = EmbeddingCache(
+            model_name=f"{settings.SENTENCE_MODEL}:{settings.EMBEDDING_BACKEND}",
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            path=None if snapshot_mode else settings.EMBEDDING_CACHE_PATH or None,
+            storage=settings.EMBEDDING_STORAGE
+        )
+        # per-worker incremental state would give each API worker its own evt_<n> ids;
+        # DBSCAN over the same snapshot window labels identically everywhere
+        self.clustering_mode = "dbscan" if snapshot_mode else settings.CLUSTERING_MODE
+        self.clusterer = IncrementalClusterer(eps=settings.CLUSTER_EPS)
+        self.dedup = NearDuplicateFilter(
+            threshold=settings.DEDUP_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+            bands=settings.DEDUP_BANDS,
+            shingle_size=settings.DEDUP_SHINGLE_SIZE
+        ) if settings.DEDUP_ENABLED else None
+        self._entity_memo: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def sentence_model(self):
+        return self.models.sentence_model()
+
+    @property
+    def nlp(self):
+        return self.models.nlp()
+
+    def warm_up(self) -> None:
+        self.models.load_all()
+
+    def process_news(self, raw_news: Union[ArticleBatch, List[Dict[str, Any]]], window_start: Optional[datetime] = None,
+                     timings: Optional[Dict[str, float]] = None,
+                     embeddings: Optional[np.ndarray] = None, live: bool = True,
+                     collapsed: Optional[Tuple[List[ArticleView], Dict[str, List[ArticleView]]]] = None
+                     ) -> List[Dict[str, Any]]:
+        if not len(raw_news):
             return []
+        if not isinstance(raw_news, ArticleBatch):
+            raw_news = ArticleBatch.from_dicts(raw_news)
 
-        for news in raw_news:
-            text = news.get('title', '') + ' ' + news.get('content', '')
-            if self.nlp:
-                doc = self.nlp(text)
-                entities = [ent.text for ent in doc.ents if ent.label_ in ['ORG', 'MONEY', 'NORP',
-                                                                           'PRODUCT']]  # NORP: Nationalities/religious groups (spaCy label)
-                tickers = re.findall(r'\b[A-Z]{1,5}\b', text)
-                entities.extend(tickers)
-                news['entities'] = list(set(entities))
-            else:
-                tickers = re.findall(r'\b[A-Z]{1,5}\b', text)
-                news['entities'] = list(set(tickers))
+        with self._lock:
+            return self._process_news(raw_news, window_start, timings if timings is not None else {}, embeddings,
+                                      live, collapsed)
+
+    def collapse(self, batch: ArticleBatch, timings: Optional[Dict[str, float]] = None
+                 ) -> Tuple[List[ArticleView], Dict[str, List[ArticleView]]]:
+        if not self.dedup:
+            return list(batch), {}
+        with track_stage("dedup", timings):
+            raw_news, duplicates = self.dedup.collapse(batch)
+        logger.info(f"🪞 Пре-дедупликация: {len(raw_news)} уникальных из {len(batch)}")
+        return raw_news, duplicates
+
+    def embed(self, raw_news: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        return self._encode([self._embedding_text(news) for news in raw_news])
+
+    def annotate(self, batch: ArticleBatch, rows: Sequence[int], encode_rows: Sequence[int],
+                 timings: Optional[Dict[str, float]] = None
+                 ) -> Tuple[List[List[str]], List[Optional[List[str]]], np.ndarray]:
+        with self._lock:
+            with track_stage("entities", timings):
+                self._extract_entities([batch[row] for row in rows])
+            texts = [self._embedding_text(batch[row]) for row in encode_rows]
+            # the caller owns the embedding cache; only the rows it missed are encoded here
+            with track_stage("encode", timings):
+                vectors = self.sentence_model.encode(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+        return batch.entities, batch.tickers, vectors
+
+    def lookup_embeddings(self, raw_news: Sequence[Mapping[str, Any]]
+                          ) -> Tuple[List[bytes], List[Optional[np.ndarray]], List[int]]:
+        keys, vectors = self.embedding_cache.lookup([self._embedding_text(news) for news in raw_news])
+        missing, seen = [], set()
+        for idx, (key, vector) in enumerate(zip(keys, vectors)):
+            # identical texts are encoded once
+            if vector is None and key not in seen:
+                seen.add(key)
+                missing.append(idx)
+        return keys, vectors, missing
+
+    def complete_embeddings(self, keys: List[bytes], vectors: List[Optional[np.ndarray]], missing: List[int],
+                            encoded: np.ndarray) -> np.ndarray:
+        if missing:
+            self.embedding_cache.put_many([keys[idx] for idx in missing], encoded)
+            self.embedding_cache.save()
+            by_key = dict(zip((keys[idx] for idx in missing), encoded))
+            vectors = [by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        record_cache("embeddings", hits=len(keys) - len(missing), misses=len(missing))
+        return np.vstack(vectors).astype(np.float32)
+
+    def _process_news(self, batch: ArticleBatch, window_start: Optional[datetime],
+                      timings: Dict[str, float], embeddings: Optional[np.ndarray] = None,
+                      live: bool = True,
+                      collapsed: Optional[Tuple[List[ArticleView], Dict[str, List[ArticleView]]]] = None
+                      ) -> List[Dict[str, Any]]:
+        # a caller that already collapsed the batch passes embeddings for the representatives only
+        if collapsed is not None:
+            raw_news, duplicates = collapsed
+        else:
+            raw_news, duplicates = self.collapse(batch, timings)
+            if self.dedup and embeddings is not None:
+                embeddings = embeddings[[news.row for news in raw_news]]
 
-        texts = [news.get('title', '') + ' ' + news.get('summary', '') + ' ' + news.get('content', '')[:200] for news in
-                 raw_news]
-        embeddings = self.sentence_model.encode(texts)
+        # precomputed embeddings come from a published snapshot whose articles already carry entities
+        if embeddings is None:
+            with track_stage("entities", timings):
+                self._extract_entities(raw_news)
 
-        clustering = DBSCAN(eps=0.4, min_samples=2, metric='cosine').fit(embeddings)
+        if self.clustering_mode == "incremental":
+            labels = self._cluster_incremental(raw_news, window_start, timings, embeddings, live)
+        else:
+            labels = self._cluster_dbscan(raw_news, timings, embeddings)
 
-        clusters = {}
-        for idx, label in enumerate(clustering.labels_):  # type: ignore  # DBSCAN.labels_ from sklearn
-            if label == -1:
-                label = f"singleton_{idx}"
-            if label not in clusters:
-                clusters[label] = []
-            clusters[label].append(raw_news[idx])
+        clusters: Dict[str, List[int]] = {}
+        for news, label in zip(raw_news, labels):
+            rows = clusters.setdefault(label, [])
+            rows.append(news.row)
+            for duplicate in duplicates.get(news['id'], ()):
+                duplicate['duplicate_of'] = news['id']
+                duplicate['entities'] = news['entities']
+                if duplicate.get('tickers') is None:
+                    duplicate['tickers'] = news.get('tickers')
+                rows.append(duplicate.row)
 
         processed_clusters = []
-        for label, cluster in clusters.items():
+        for label, rows in clusters.items():
             cluster_data = {
                 'cluster_id': label,
-                'size': len(cluster),
-                'entities': list(set(ent for news in cluster for ent in news.get('entities', []))),
-                'cluster': cluster
+                'size': len(rows),
+                'entities': list(set(ent for row in rows for ent in batch.entities[row])),
+                'tickers': [ticker for ticker, _ in
+                            Counter(t for row in rows for t in batch.tickers[row] or []).most_common()],
+                'cluster': batch.take(rows)
             }
             processed_clusters.append(cluster_data)
 
-        logger.info(f"📦 Сформировано {len(processed_clusters)} кластеров из {len(raw_news)} новостей")
-        return processed_clusters
\ No newline at end of file
+        CLUSTERS_FORMED.inc(len(processed_clusters))
+        logger.info(f"📦 Сформировано {len(processed_clusters)} кластеров из {len(batch)} новостей")
+        return processed_clusters
+
+    def _extract_entities(self, raw_news: List[Dict[str, Any]]) -> None:
+        texts = [news.get('title', '') + ' ' + news.get('content', '') for news in raw_news]
+
+        nlp = self.nlp
+        if nlp:
+            pending = [idx for idx, news in enumerate(raw_news) if news['id'] not in self._entity_memo]
+            docs = nlp.pipe((texts[idx] for idx in pending),
+                                 batch_size=settings.SPACY_BATCH_SIZE,
+                                 n_process=settings.SPACY_N_PROCESS)
+            for idx, doc in zip(pending, docs):
+                self._entity_memo[raw_news[idx]['id']] = [
+                    ent.text for ent in doc.ents
+                    if ent.label_ in ['ORG', 'MONEY', 'NORP', 'PRODUCT']]  # NORP: Nationalities/religious groups (spaCy label)
+            record_cache("entities", hits=len(raw_news) - len(pending), misses=len(pending))
+            logger.info(f"🏷️ NER: {len(pending)} новых из {len(raw_news)}, остальные из памяти")
+
+        matcher = get_ticker_matcher()
+        for news, text in zip(raw_news, texts):
+            entities = []
+            if nlp:
+                entities.extend(self._entity_memo[news['id']])
+                self._entity_memo.move_to_end(news['id'])
+            tickers = news.get('tickers')
+            if tickers is None:
+                tickers = news['tickers'] = matcher.match(text)
+            entities.extend(tickers)
+            news['entities'] = list(set(entities))
+
+        while len(self._entity_memo) > settings.ENTITY_MEMO_SIZE:
+            self._entity_memo.popitem(last=False)
+
+    def _cluster_dbscan(self, raw_news: List[Dict[str, Any]], timings: Dict[str, float],
+                        embeddings: Optional[np.ndarray] = None) -> List[str]:
+        if embeddings is None:
+            embeddings = self._encode([self._embedding_text(news) for news in raw_news], timings)
+        with track_stage("cluster", timings):
+            clustering = DBSCAN(eps=settings.CLUSTER_EPS, min_samples=2, metric='cosine').fit(embeddings)
+        return [f"singleton_{idx}" if label == -1 else str(label)
+                for idx, label in enumerate(clustering.labels_)]  # type: ignore  # DBSCAN.labels_ from sklearn
+
+    def _cluster_incremental(self, raw_news: List[Dict[str, Any]], window_start: Optional[datetime],
+                             timings: Dict[str, float], embeddings: Optional[np.ndarray] = None,
+                             live: bool = True) -> List[str]:
+        # historical windows must not move the shared state that keeps live cluster ids stable
+        clusterer = self.clusterer if live else IncrementalClusterer(eps=settings.CLUSTER_EPS)
+        with track_stage("cluster", timings):
+            if live:
+                # every live window shares the clusterer, so a short one must not expire what a longer one needs
+                retain_from = max(news['published_at'] for news in raw_news) - \
+                    timedelta(hours=settings.CLUSTER_RETENTION_HOURS)
+                clusterer.expire(min(window_start, retain_from) if window_start else retain_from)
+            new_rows = [idx for idx, news in enumerate(raw_news) if not clusterer.is_known(news['id'])]
+            new_news = [raw_news[idx] for idx in new_rows]
+
+        if new_news:
+            if embeddings is None:
+                new_embeddings = self._encode([self._embedding_text(news) for news in new_news], timings)
+            else:
+                new_embeddings = embeddings[new_rows]
+            with track_stage("cluster", timings):
+                clusterer.assign([news['id'] for news in new_news],
+                                      [news['published_at'] for news in new_news],
+                                      new_embeddings)
+        logger.info(f"🧩 Инкрементальная кластеризация: {len(new_news)} новых из {len(raw_news)}")
+        return clusterer.labels([news['id'] for news in raw_news])
+
+    @staticmethod
+    def _embedding_text(news: Dict[str, Any]) -> str:
+        return news.get('title', '') + ' ' + news.get('summary', '') + ' ' + news.get('content', '')[:200]
+
+    def _encode(self, texts: List[str], timings: Optional[Dict[str, float]] = None) -> np.ndarray:
+        with track_stage("encode", timings):
+            keys, vectors = self.embedding_cache.lookup(texts)
+            missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+            if missing:
+                encoded = self.sentence_model.encode([texts[idx] for idx in missing])
+                self.embedding_cache.put_many([keys[idx] for idx in missing], encoded)
+                for idx, vector in zip(missing, encoded):
+                    vectors[idx] = vector
+                self.embedding_cache.save()
+        record_cache("embeddings", hits=len(texts) - len(missing), misses=len(missing))
+        logger.info(f"🧠 Эмбеддинги: {len(texts) - len(missing)} из кэша, {len(missing)} посчитано заново "
+                    f"(hit rate {self.embedding_cache.stats()['hit_rate']:.0%})")
+        return np.vstack(vectors).astype(np.float32)
@@ -1,45 +1,103 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import numpy as np
-import yfinance as yf
 import logging
+from app.core.config import settings
+from app.services.market_data import MarketDataProvider, create_market_data_provider
 
 logger = logging.getLogger(__name__)
 
 
 class NewsRanker:
-    def rank_clusters(self, clusters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        ranked = []
-        for cluster in clusters:
-            hotness = self._calculate_hotness(cluster)
-            ranked.append({'cluster': cluster, 'hotness': hotness})
-        ranked = sorted(ranked, key=lambda x: x['hotness'], reverse=True)
-        logger.info(f"🎯 Топ-кластеры ранжированы, макс hotness: {ranked[0]['hotness'] if ranked else 0}")
+    def __init__(self, market_data: Optional[MarketDataProvider] = None):
+        self.market_data = market_data or create_market_data_provider()
+
+    def rank_clusters(self, clusters: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        if not clusters:
+            return []
+
+        hotness = self._calculate_hotness(self._cluster_features(clusters), self._market_impact(clusters))
+        order = self._top_k_order(hotness, top_k)
+
+        ranked = [{'cluster': clusters[idx], 'hotness': float(hotness[idx])} for idx in order]
+        logger.info(f"🎯 Топ-кластеры ранжированы ({len(ranked)} из {len(clusters)}), "
+                    f"макс hotness: {ranked[0]['hotness'] if ranked else 0}")
         return ranked
 
+    def rank_horizons(self, clusters: List[Dict[str, Any]], trends: Dict[int, Dict[str, np.ndarray]],
+                      top_k: Optional[int] = None) -> Dict[int, List[Dict[str, Any]]]:
+        if not clusters:
+            return {hours: [] for hours in trends}
+
+        features = self._cluster_features(clusters)
+        impact = self._market_impact(clusters)
+        rankings = {}
+        for hours, trend in trends.items():
+            active = np.flatnonzero(trend['articles'] > 0)
+            hotness = self._calculate_hotness(features, impact, velocity=trend['velocity'])
+            order = active[self._top_k_order(hotness[active], top_k)]
+            rankings[hours] = [{
+                'cluster': clusters[idx],
+                'hotness': float(hotness[idx]),
+                'trend': {
+                    'horizon_hours': hours,
+                    'articles': int(trend['articles'][idx]),
+                    'velocity': float(trend['velocity'][idx]),
+                    'acceleration': float(trend['acceleration'][idx])
+                }
+            } for idx in order]
+        logger.info("📈 Ранжирование по горизонтам: " +
+                    ", ".join(f"{hours}h {len(ranked)}" for hours, ranked in rankings.items()))
+        return rankings
+
+    def _market_impact(self, clusters: List[Dict[str, Any]]) -> np.ndarray:
+        tickers = [self._cluster_ticker(cluster) for cluster in clusters]
+        changes = self.market_data.get_changes([ticker for ticker in tickers if ticker])
+        return np.array([abs(changes.get(ticker, 0.0)) if ticker else 0.0 for ticker in tickers], dtype=np.float64)
+
+    @staticmethod
+    def _cluster_ticker(cluster: Dict[str, Any]) -> Optional[str]:
+        tickers = cluster.get('tickers', [])
+        return tickers[0] if tickers else None
+
+    @staticmethod
+    def _cluster_features(clusters: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        members = [cluster['cluster'] for cluster in clusters]
+        sizes = np.array([len(cluster) for cluster in members], dtype=np.int64)
+        batches = {id(cluster.batch): cluster.batch for cluster in members}
+        if len(batches) == 1:
+            batch = next(iter(batches.values()))
+            rows = np.concatenate([cluster.rows for cluster in members])
+            published = batch.published[rows].astype(np.float64)
+            sentiment = batch.sentiment[rows].astype(np.float64)
+        else:
+            published = np.concatenate([cluster.published for cluster in members]).astype(np.float64)
+            sentiment = np.concatenate([cluster.sentiment for cluster in members]).astype(np.float64)
+
+        span_hours = np.zeros(len(clusters), dtype=np.float64)
+        mean_sentiment = np.zeros(len(clusters), dtype=np.float64)
+        nonempty = sizes > 0
+        if len(published):
+            starts = (np.cumsum(sizes) - sizes)[nonempty]
+            span_hours[nonempty] = (np.maximum.reduceat(published, starts) -
+                                    np.minimum.reduceat(published, starts)) / 3600
+            mean_sentiment[nonempty] = np.add.reduceat(sentiment, starts) / sizes[nonempty]
+        return {'size': sizes, 'span_hours': span_hours, 'sentiment': mean_sentiment}
+
+    @staticmethod
+    def _calculate_hotness(features: Dict[str, np.ndarray], impact: np.ndarray,
+                           velocity: Optional[np.ndarray] = None) -> np.ndarray:
+        if velocity is None:
+            velocity = features['size'] / np.maximum(features['span_hours'], 1)
+        hotness = (settings.HOTNESS_WEIGHT_VELOCITY * velocity / settings.HOTNESS_VELOCITY_SCALE +
+                   settings.HOTNESS_WEIGHT_SENTIMENT * (features['sentiment'] + 1) / 2 +
+                   settings.HOTNESS_WEIGHT_IMPACT * impact)
+        return np.where(features['size'] > 0, np.minimum(hotness, 1.0), 0.0)
+
     @staticmethod
-    def _calculate_hotness(cluster: Dict[str, Any]) -> float:
-        cluster_list = cluster.get('cluster', [])
-        if not cluster_list:
-            return 0.0
-
-        times = [news['published_at'] for news in cluster_list]
-        time_delta = (max(times) - min(times)).total_seconds() / 3600 if times else 0
-        velocity = len(cluster_list) / max(time_delta, 1)
-
-        avg_sentiment = np.mean([news.get('sentiment', 0) for news in cluster_list])
-
-        entities = cluster.get('entities', [])
-        impact = 0.0
-        if entities:
-            ticker = entities[0]
-            try:
-                data = yf.Ticker(ticker).history(period='1d')
-                if len(data) >= 2:
-                    change = (data['Close'][-1] - data['Close'][-2]) / data['Close'][-2]
-                    impact = abs(change)
-            except (ValueError, KeyError, IndexError) as e:
-                logger.warning(f"yfinance ошибка для {ticker}: {e}")
-                pass
-
-        hotness = 0.5 * velocity / 10 + 0.3 * (avg_sentiment + 1) / 2 + 0.2 * impact
-        return min(hotness, 1.0)
\ No newline at end of file
+    def _top_k_order(hotness: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        if top_k is not None and top_k < len(hotness):
+            if top_k <= 0:
+                return np.empty(0, dtype=np.int64)
+            candidates = np.argpartition(-hotness, top_k - 1)[:top_k]
+            return candidates[np.argsort(-hotness[candidates], kind='stable')]
+        return np.argsort(-hotness, kind='stable')
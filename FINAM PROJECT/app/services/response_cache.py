@@ -0,0 +1,68 @@
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import hashlib
+import time
+import orjson
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    # pydantic Url and similar scalar wrappers
+    return str(value)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default)
+
+
+class EncodedResponse:
+    __slots__ = ("body", "digest", "expires_at", "_compressed")
+
+    def __init__(self, body: bytes, expires_at: Optional[float] = None):
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.expires_at = expires_at
+        self._compressed: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_payload(cls, payload: Any, expires_at: Optional[float] = None) -> "EncodedResponse":
+        return cls(dumps(payload), expires_at)
+
+    @property
+    def etag(self) -> str:
+        return self.etag_for(None)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        # a strong tag identifies exact bytes, so every content-coding gets its own
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at is None or self.expires_at > time.monotonic()
+
+    @property
+    def max_age(self) -> int:
+        if self.expires_at is None:
+            return 0
+        return max(0, int(self.expires_at - time.monotonic()))
+
+    def compressed(self, encoding: str) -> bytes:
+        body = self._compressed.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.body, quality=settings.RESPONSE_BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+            self._compressed[encoding] = body
+        return body
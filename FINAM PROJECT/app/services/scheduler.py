@@ -0,0 +1,29 @@
+from typing import Callable, Awaitable, Optional
+from datetime import datetime, timezone
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.models.schemas import TimeWindow
+from app.core.config import settings
+
+
+def create_scheduler(refresh: Callable[[TimeWindow], Awaitable[None]],
+                     prune: Optional[Callable[[], Awaitable[None]]] = None) -> AsyncIOScheduler:
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        refresh,
+        'interval',
+        hours=settings.SCHEDULER_INTERVAL_HOURS,
+        args=[TimeWindow(hours=settings.SCHEDULER_WINDOW_HOURS)],
+        next_run_time=datetime.now(timezone.utc),
+        max_instances=1,
+        coalesce=True
+    )
+    if prune is not None:
+        scheduler.add_job(
+            prune,
+            'interval',
+            hours=settings.ARTICLE_STORE_PRUNE_INTERVAL_HOURS,
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True
+        )
+    return scheduler
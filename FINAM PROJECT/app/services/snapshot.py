@@ -0,0 +1,194 @@
+from typing import List, Dict, Any, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+import json
+import logging
+import mmap
+import os
+import shutil
+import threading
+import time
+import numpy as np
+from app.core.config import settings
+from app.services.article_store import ArticleStore
+
+logger = logging.getLogger(__name__)
+
+_CURRENT = "CURRENT"
+
+
+class SnapshotWriter:
+    def __init__(self, directory: str, keep: int = 2):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, articles: List[Dict[str, Any]], embeddings: np.ndarray,
+              results: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        published = np.array([ArticleStore._to_epoch(news['published_at']) for news in articles], dtype=np.int64)
+        order = np.argsort(published, kind="stable")
+        payloads = [json.dumps(articles[idx], default=ArticleStore._json_default).encode("utf-8") for idx in order]
+        offsets = np.zeros(len(payloads) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(payload) for payload in payloads])
+
+        entity_rows: Dict[str, List[int]] = defaultdict(list)
+        for row, idx in enumerate(order):
+            for entity in {ArticleStore.normalize_entity(e) for e in articles[idx].get('entities', [])}:
+                if entity:
+                    entity_rows[entity].append(row)
+        entities, rows, start = {}, [], 0
+        for entity, entity_row_list in entity_rows.items():
+            entities[entity] = [start, start + len(entity_row_list)]
+            rows.extend(entity_row_list)
+            start += len(entity_row_list)
+
+        generation = f"gen-{time.time_ns()}"
+        path = os.path.join(self.directory, generation)
+        tmp_path = f"{path}.tmp"
+        os.makedirs(tmp_path)
+        with open(os.path.join(tmp_path, "articles.bin"), "wb") as f:
+            f.writelines(payloads)
+        np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+        np.save(os.path.join(tmp_path, "published.npy"), published[order])
+        np.save(os.path.join(tmp_path, "embeddings.npy"), np.asarray(embeddings, dtype=np.float16)[order])
+        np.save(os.path.join(tmp_path, "entity_rows.npy"), np.array(rows, dtype=np.int64))
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "generation": generation,
+                "created_at": time.time(),
+                "count": len(payloads),
+                "entities": entities,
+                "results": results or {}
+            }, f, ensure_ascii=False)
+        os.rename(tmp_path, path)
+
+        pointer = os.path.join(self.directory, _CURRENT)
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(f"{pointer}.tmp", pointer)
+        self._cleanup(generation)
+        logger.info(f"📸 Снимок {generation}: {len(payloads)} новостей, {len(results or {})} готовых ответов")
+        return generation
+
+    def _cleanup(self, current: str) -> None:
+        generations = sorted(name for name in os.listdir(self.directory) if name.startswith("gen-"))
+        # readers that still map an older generation keep their pages after unlink
+        for name in generations[:-self.keep] if self.keep else generations:
+            if name != current:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+class _Generation:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.name = self.meta["generation"]
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.published = np.load(os.path.join(path, "published.npy"), mmap_mode="r")
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        self.entity_rows = np.load(os.path.join(path, "entity_rows.npy"), mmap_mode="r")
+        self.articles: Any = b""
+        if self.meta["count"]:
+            with open(os.path.join(path, "articles.bin"), "rb") as f:
+                self.articles = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        return ArticleStore._decode(self.articles[self.offsets[row]:self.offsets[row + 1]])
+
+
+class SnapshotReader:
+    def __init__(self, directory: str, poll_seconds: float = 5.0):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self._generation: Optional[_Generation] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._current() is not None
+
+    def status(self) -> Dict[str, Any]:
+        generation = self._current()
+        if generation is None:
+            return {"generation": None}
+        return {
+            "generation": generation.name,
+            "articles": generation.meta["count"],
+            "age_seconds": round(time.time() - generation.meta["created_at"], 1)
+        }
+
+    def refresh(self) -> bool:
+        self._checked_at = time.monotonic()
+        try:
+            with open(os.path.join(self.directory, _CURRENT), encoding="utf-8") as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._generation is not None and self._generation.name == name:
+                return False
+            self._generation = _Generation(os.path.join(self.directory, name))
+        logger.info(f"📸 Подключён снимок {name}: {self._generation.meta['count']} новостей")
+        return True
+
+    def window(self, start: datetime, end: datetime) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        generation = self._require()
+        lo, hi = self._bounds(generation, start, end)
+        return [generation.record(row) for row in range(lo, hi)], generation.embeddings[lo:hi]
+
+    def query(self, start: datetime, end: datetime, entity: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        generation = self._require()
+        rows = self._rows(generation, start, end, entity)[::-1]
+        if limit is not None:
+            rows = rows[:limit]
+        return [generation.record(int(row)) for row in rows]
+
+    def count(self, start: datetime, end: datetime, entity: Optional[str] = None) -> int:
+        return len(self._rows(self._require(), start, end, entity))
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        generation = self._current()
+        if generation is None:
+            return None
+        cached = generation.meta["results"].get(key)
+        if cached and cached["expires_at"] > time.time():
+            return cached
+        return None
+
+    def _rows(self, generation: _Generation, start: datetime, end: datetime, entity: Optional[str]) -> np.ndarray:
+        lo, hi = self._bounds(generation, start, end)
+        if not entity:
+            return np.arange(lo, hi)
+        span = generation.meta["entities"].get(ArticleStore.normalize_entity(entity))
+        if not span:
+            return np.empty(0, dtype=np.int64)
+        rows = generation.entity_rows[span[0]:span[1]]
+        return rows[(rows >= lo) & (rows < hi)]
+
+    @staticmethod
+    def _bounds(generation: _Generation, start: datetime, end: datetime) -> Tuple[int, int]:
+        lo = int(np.searchsorted(generation.published, ArticleStore._to_epoch(start), side="left"))
+        hi = int(np.searchsorted(generation.published, ArticleStore._to_epoch(end), side="right"))
+        return lo, hi
+
+    def _current(self) -> Optional[_Generation]:
+        if time.monotonic() - self._checked_at >= self.poll_seconds:
+            try:
+                self.refresh()
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Не удалось подключить снимок из {self.directory}: {e}")
+        return self._generation
+
+    def _require(self) -> _Generation:
+        generation = self._current()
+        if generation is None:
+            raise RuntimeError(f"Снимок данных в {self.directory} ещё не опубликован")
+        return generation
+
+
+@lru_cache(maxsize=1)
+def get_snapshot_reader() -> SnapshotReader:
+    return SnapshotReader(settings.SNAPSHOT_DIR, poll_seconds=settings.SNAPSHOT_POLL_SECONDS)
@@ -0,0 +1,92 @@
+from typing import List, Dict, Iterable, Tuple
+from functools import lru_cache
+import csv
+import logging
+import os
+import re
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\$?\w+(?:[.&'-]\w+)*")
+_TERMINAL = ""
+DEFAULT_DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tickers.csv")
+
+
+class TickerMatcher:
+    def __init__(self, entries: Iterable[Tuple[str, List[str]]], min_symbol_length: int = 2):
+        self.min_symbol_length = min_symbol_length
+        self._symbols: Dict[str, str] = {}
+        self._aliases: Dict[str, dict] = {}
+        self.max_alias_tokens = 1
+        for ticker, aliases in entries:
+            ticker = ticker.strip().upper()
+            if not ticker:
+                continue
+            self._symbols[ticker] = ticker
+            for alias in aliases:
+                self._add_alias(alias, ticker)
+
+    @classmethod
+    def from_csv(cls, path: str, min_symbol_length: int = 2) -> "TickerMatcher":
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = [(row["ticker"], [a for a in (row.get("aliases") or "").split("|") if a.strip()])
+                    for row in csv.DictReader(f)]
+        matcher = cls(rows, min_symbol_length=min_symbol_length)
+        logger.info(f"📚 Словарь тикеров {path}: {len(matcher._symbols)} символов")
+        return matcher
+
+    def match(self, text: str) -> List[str]:
+        tokens = _TOKEN.findall(text)
+        found: Dict[str, None] = {}
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if not (token[:1].isupper() or token[:1] == "$"):
+                i += 1
+                continue
+            ticker, length = self._match_alias(tokens, i)
+            if ticker is None:
+                ticker, length = self._match_symbol(self._strip_possessive(token)), 1
+            if ticker is not None:
+                found[ticker] = None
+            i += length
+        return list(found)
+
+    def _match_alias(self, tokens: List[str], start: int):
+        node = self._aliases
+        best, best_length = None, 1
+        for offset in range(min(self.max_alias_tokens, len(tokens) - start)):
+            node = node.get(self._strip_possessive(tokens[start + offset]).casefold())
+            if node is None:
+                break
+            if _TERMINAL in node:
+                best, best_length = node[_TERMINAL], offset + 1
+        return best, best_length
+
+    def _match_symbol(self, token: str):
+        if token.startswith("$"):
+            return self._symbols.get(token[1:].upper())
+        if len(token) >= self.min_symbol_length and token.isupper():
+            return self._symbols.get(token)
+        return None
+
+    def _add_alias(self, alias: str, ticker: str) -> None:
+        tokens = [self._strip_possessive(token).casefold() for token in _TOKEN.findall(alias)]
+        if not tokens:
+            return
+        node = self._aliases
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_TERMINAL] = ticker
+        self.max_alias_tokens = max(self.max_alias_tokens, len(tokens))
+
+    @staticmethod
+    def _strip_possessive(token: str) -> str:
+        return token[:-2] if token.endswith(("'s", "'S")) else token
+
+
+@lru_cache(maxsize=1)
+def get_ticker_matcher() -> TickerMatcher:
+    return TickerMatcher.from_csv(settings.TICKER_DICTIONARY_PATH or DEFAULT_DICTIONARY_PATH,
+                                  min_symbol_length=settings.TICKER_MIN_SYMBOL_LENGTH)
@@ -0,0 +1,115 @@
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import threading
+import numpy as np
+
+
+class TrendTracker:
+    def __init__(self, bucket_seconds: int = 300, history_hours: int = 48):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = max(1, history_hours * 3600 // bucket_seconds)
+        # one ring buffer row per cluster; column = epoch bucket % capacity
+        self._counts = np.zeros((64, self.capacity), dtype=np.int32)
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._articles: Dict[str, Tuple[str, int]] = {}
+        self._head: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def cluster_key(cluster: Dict[str, Any]) -> str:
+        members = cluster['cluster']
+        if str(cluster['cluster_id']).startswith("evt_"):
+            return cluster['cluster_id']
+        # DBSCAN labels are renumbered on every run; the oldest member is stable across runs
+        published = members.published
+        oldest = np.flatnonzero(published == published.min())
+        return min(members.batch.ids[int(members.rows[idx])] for idx in oldest)
+
+    def observe(self, clusters: Sequence[Dict[str, Any]], now: int) -> List[str]:
+        keys = [self.cluster_key(cluster) for cluster in clusters]
+        with self._lock:
+            self._advance(now // self.bucket_seconds)
+            oldest = self._head - self.capacity
+            add_slots, add_buckets, drop_slots, drop_buckets = [], [], [], []
+            for key, cluster in zip(keys, clusters):
+                members = cluster['cluster']
+                buckets = np.minimum(members.published // self.bucket_seconds, self._head)
+                for row, bucket in zip(members.rows, buckets.tolist()):
+                    if bucket <= oldest:
+                        continue
+                    article_id = members.batch.ids[int(row)]
+                    previous = self._articles.get(article_id)
+                    if previous is not None:
+                        if previous[0] == key:
+                            continue
+                        # the article moved to another cluster since the last run
+                        if previous[0] in self._slots and previous[1] > oldest:
+                            drop_slots.append(self._slots[previous[0]])
+                            drop_buckets.append(previous[1])
+                    add_slots.append(self._slot(key))
+                    add_buckets.append(bucket)
+                    self._articles[article_id] = (key, bucket)
+            if drop_slots:
+                np.subtract.at(self._counts, (np.array(drop_slots), np.array(drop_buckets) % self.capacity), 1)
+            if add_slots:
+                np.add.at(self._counts, (np.array(add_slots), np.array(add_buckets) % self.capacity), 1)
+        return keys
+
+    def horizons(self, keys: Sequence[str], horizons: Sequence[int]) -> Dict[int, Dict[str, np.ndarray]]:
+        with self._lock:
+            slots = np.array([self._slots.get(key, -1) for key in keys], dtype=np.int64)
+            columns = (self._head - np.arange(self.capacity)) % self.capacity if self._head is not None \
+                else np.arange(self.capacity)
+            # newest bucket first, so a prefix sum answers every horizon at once
+            recent = np.where(slots[:, None] >= 0, self._counts[np.maximum(slots, 0)][:, columns], 0)
+        totals = np.cumsum(recent, axis=1, dtype=np.int64)
+        totals = np.concatenate([np.zeros((len(keys), 1), dtype=np.int64), totals], axis=1)
+
+        result: Dict[int, Dict[str, np.ndarray]] = {}
+        for hours in horizons:
+            width = max(1, hours * 3600 // self.bucket_seconds)
+            if 2 * width > self.capacity:
+                raise ValueError(f"horizon {hours}h needs {2 * width} buckets, history holds {self.capacity}")
+            span_hours = width * self.bucket_seconds / 3600
+            current = totals[:, width]
+            previous = totals[:, min(2 * width, self.capacity)] - current
+            velocity = current / span_hours
+            result[hours] = {
+                'articles': current,
+                'velocity': velocity,
+                'acceleration': (velocity - previous / span_hours) / span_hours,
+            }
+        return result
+
+    def _slot(self, key: str) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._slots)
+                if slot >= len(self._counts):
+                    self._counts = np.vstack([self._counts, np.zeros_like(self._counts)])
+            self._slots[key] = slot
+        return slot
+
+    def _advance(self, bucket: int) -> None:
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket <= self._head:
+            return
+        steps = min(bucket - self._head, self.capacity)
+        self._counts[:, (self._head + 1 + np.arange(steps)) % self.capacity] = 0
+        self._head = bucket
+
+        oldest = bucket - self.capacity
+        self._articles = {article_id: entry for article_id, entry in self._articles.items() if entry[1] > oldest}
+        live = {key for key, _ in self._articles.values()}
+        for key in [key for key in self._slots if key not in live]:
+            slot = self._slots.pop(key)
+            self._counts[slot] = 0
+            self._free.append(slot)
@@ -0,0 +1,75 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+import csv
+import random
+from app.services.ticker_matcher import DEFAULT_DICTIONARY_PATH
+
+SOURCES = ["Reuters", "Bloomberg", "Interfax", "RBC", "Kommersant", "MarketWatch", "CNBC", "Financial Times"]
+
+HEADLINES = [
+    "{company} shares {move} {pct}% after {event}",
+    "{company} ({ticker}) {move} as investors weigh {event}",
+    "Analysts see {company} {outlook} following {event}",
+    "{company} reports {event}, stock {move} {pct}%",
+    "Why {company} stock {move} today: {event}",
+]
+
+EVENTS = [
+    "quarterly earnings beat", "a revenue miss", "a surprise dividend hike", "CEO resignation",
+    "a regulatory probe", "a $2 billion buyback", "a merger announcement", "weak guidance",
+    "a credit rating downgrade", "a new product launch", "supply chain disruptions", "record deliveries",
+]
+
+MOVES = ["jump", "slide", "surge", "fall", "climb", "tumble"]
+OUTLOOKS = ["upside", "further downside", "a volatile quarter", "margin pressure"]
+
+BODY = ("{company} said on {weekday} that {event} would affect its full-year outlook. "
+        "Trading volume in {ticker} was {volume} times the 30-day average, and peers in the sector "
+        "moved in sympathy. Market participants are watching the next central bank meeting for signals.")
+
+
+def load_companies(path: str = DEFAULT_DICTIONARY_PATH) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    return [{"ticker": row["ticker"], "name": (row.get("aliases") or row["ticker"]).split("|")[0]} for row in rows]
+
+
+def generate_corpus(size: int, duplicate_rate: float = 0.3, hours: int = 24, seed: int = 42,
+                    now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    companies = load_companies()
+    now = now or datetime.now(timezone.utc)
+    articles: List[Dict[str, Any]] = []
+
+    for idx in range(size):
+        published_at = now - timedelta(seconds=rng.uniform(0, hours * 3600 - 60))
+        source = rng.choice(SOURCES)
+        if articles and rng.random() < duplicate_rate:
+            original = rng.choice(articles)
+            title = original["title"]
+            if rng.random() < 0.5:
+                title = title.replace(" after ", " following ").replace(" as ", " while ")
+            article = dict(original, title=title)
+        else:
+            company = rng.choice(companies)
+            event = rng.choice(EVENTS)
+            article = {
+                "title": rng.choice(HEADLINES).format(
+                    company=company["name"], ticker=company["ticker"], move=rng.choice(MOVES),
+                    pct=rng.randint(1, 25), event=event, outlook=rng.choice(OUTLOOKS)),
+                "content": BODY.format(
+                    company=company["name"], ticker=company["ticker"], event=event,
+                    weekday=published_at.strftime("%A"), volume=rng.randint(2, 9)),
+                "sentiment": round(rng.uniform(-1, 1), 3),
+                "category": "markets",
+            }
+        article.update({
+            "id": f"bench-{seed}-{idx}",
+            "url": f"https://news.example.com/{source.lower().replace(' ', '-')}/{idx}",
+            "source": source,
+            "published_at": published_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+        articles.append(article)
+
+    articles.sort(key=lambda a: a["published_at"])
+    return articles
@@ -0,0 +1,110 @@
+from typing import List, Dict, Any
+import argparse
+import json
+import logging
+import sys
+import time
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+from app.core.config import settings
+from app.services.embedding_backend import create_embedding_backend
+from app.services.embedding_cache import EmbeddingCache
+from app.services.processor import NewsProcessor
+from benchmarks.corpus import generate_corpus
+
+logger = logging.getLogger("benchmarks")
+
+
+def _cluster(embeddings: np.ndarray, eps: float) -> np.ndarray:
+    return DBSCAN(eps=eps, min_samples=2, metric="cosine").fit(embeddings).labels_
+
+
+def _roundtrip(embeddings: np.ndarray, storage: str) -> np.ndarray:
+    cache = EmbeddingCache(model_name="quality-check", max_size=len(embeddings), storage=storage)
+    return np.vstack([cache._decode(cache._encode(vector)) for vector in embeddings]).astype(np.float32)
+
+
+def _encode(backend: str, texts: List[str]) -> Dict[str, Any]:
+    model = create_embedding_backend(backend)
+    model.encode(texts[:8])
+    start = time.perf_counter()
+    embeddings = model.encode(texts)
+    elapsed = time.perf_counter() - start
+    logger.info(f"🧠 {backend}: {len(texts)} текстов за {elapsed:.2f}s")
+    return {"embeddings": embeddings, "seconds": elapsed}
+
+
+def _compare(baseline: np.ndarray, baseline_labels: np.ndarray, candidate: np.ndarray, eps: float) -> Dict[str, Any]:
+    labels = _cluster(candidate, eps)
+    cosine = np.sum(baseline * candidate, axis=1) / np.maximum(
+        np.linalg.norm(baseline, axis=1) * np.linalg.norm(candidate, axis=1), 1e-12)
+    return {
+        "adjusted_rand_index": round(float(adjusted_rand_score(baseline_labels, labels)), 4),
+        "clusters": int(len(set(labels)) - (1 if -1 in labels else 0)),
+        "noise": int(np.sum(labels == -1)),
+        "cosine_to_baseline_mean": round(float(cosine.mean()), 5),
+        "cosine_to_baseline_min": round(float(cosine.min()), 5),
+    }
+
+
+def main(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = generate_corpus(args.size, duplicate_rate=args.duplicate_rate, seed=args.seed)
+    texts = [NewsProcessor._embedding_text(news) for news in corpus]
+
+    baseline = _encode("torch", texts)
+    baseline_labels = _cluster(baseline["embeddings"], args.eps)
+    report = {
+        "size": args.size,
+        "seed": args.seed,
+        "eps": args.eps,
+        "sentence_model": settings.SENTENCE_MODEL,
+        "baseline": {
+            "backend": "torch-float32",
+            "seconds": round(baseline["seconds"], 3),
+            "clusters": int(len(set(baseline_labels)) - (1 if -1 in baseline_labels else 0)),
+            "noise": int(np.sum(baseline_labels == -1)),
+        },
+        "variants": {},
+    }
+
+    candidates = {"torch": baseline}
+    if "onnx" in args.backends:
+        candidates["onnx"] = _encode("onnx", texts)
+    for backend, result in candidates.items():
+        for storage in args.storage:
+            name = f"{backend}-{storage}"
+            variant = _compare(baseline["embeddings"], baseline_labels,
+                               _roundtrip(result["embeddings"], storage), args.eps)
+            variant["encode_seconds"] = round(result["seconds"], 3)
+            report["variants"][name] = variant
+            logger.info(f"📏 {name}: ARI {variant['adjusted_rand_index']}")
+    return report
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare cluster assignments of embedding backends "
+                                                 "against the float32 SentenceTransformer baseline")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--eps", type=float, default=settings.CLUSTER_EPS)
+    parser.add_argument("--backends", nargs="+", choices=["torch", "onnx"], default=["torch", "onnx"])
+    parser.add_argument("--storage", nargs="+", choices=["float16", "int8"], default=["float16", "int8"])
+    parser.add_argument("--min-ari", type=float, default=0.95, help="exit with status 1 below this ARI")
+    parser.add_argument("--output", help="write JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    cli_args = parse_args(sys.argv[1:])
+    result = main(cli_args)
+    payload = json.dumps(result, indent=2, ensure_ascii=False)
+    if cli_args.output:
+        with open(cli_args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    worst = min(variant["adjusted_rand_index"] for variant in result["variants"].values())
+    sys.exit(0 if worst >= cli_args.min_ari else 1)
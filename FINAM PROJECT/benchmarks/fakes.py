@@ -0,0 +1,95 @@
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+import asyncio
+import json
+import zlib
+from aiohttp import web
+from app.services.market_data import FixtureMarketDataBackend
+
+
+class FakeNewsServer:
+    def __init__(self, platform_articles: List[Dict[str, Any]], rss_feeds: List[List[Dict[str, Any]]],
+                 platform_latency: float = 0.0, rss_latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.platform_articles = platform_articles
+        self.rss_bodies = [self._render_rss(idx, items) for idx, items in enumerate(rss_feeds)]
+        self.platform_latency = platform_latency
+        self.rss_latency = rss_latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def rss_urls(self) -> List[str]:
+        return [f"{self.base_url}/rss/{idx}" for idx in range(len(self.rss_bodies))]
+
+    async def start(self) -> "FakeNewsServer":
+        app = web.Application()
+        app.router.add_get("/news", self._news)
+        app.router.add_get("/rss/{idx}", self._rss)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _news(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.platform_latency:
+            await asyncio.sleep(self.platform_latency)
+        limit = int(request.query.get("limit", 100))
+        page = int(request.query.get("page", 1))
+        items = self.platform_articles[(page - 1) * limit:page * limit]
+        body = {"status": "ok", "totalResults": len(self.platform_articles), "articles": items}
+        return web.Response(body=json.dumps(body).encode("utf-8"), content_type="application/json")
+
+    async def _rss(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.rss_latency:
+            await asyncio.sleep(self.rss_latency)
+        body = self.rss_bodies[int(request.match_info["idx"])]
+        return web.Response(body=body, content_type="application/rss+xml")
+
+    @staticmethod
+    def _render_rss(idx: int, items: List[Dict[str, Any]]) -> bytes:
+        entries = []
+        for item in items:
+            published_at = datetime.strptime(item["published_at"], "%Y-%m-%dT%H:%M:%S%z")
+            entries.append(
+                f"<item><title>{escape(item['title'])}</title><link>{escape(item['url'])}</link>"
+                f"<guid>{escape(item['id'])}</guid><description>{escape(item['content'])}</description>"
+                f"<pubDate>{format_datetime(published_at)}</pubDate></item>"
+            )
+        return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f'<title>Bench feed {idx}</title>{"".join(entries)}</channel></rss>').encode("utf-8")
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def complete(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return json.dumps({"headline": f"Synthetic headline #{self.calls}",
+                           "why_now": "Several outlets reported the same development within the hour."})
+
+
+def fixture_market_backend(tickers: List[str], latency: float = 0.0) -> FixtureMarketDataBackend:
+    changes = {ticker: ((zlib.crc32(ticker.encode()) % 200) - 100) / 2000 for ticker in tickers}
+    return FixtureMarketDataBackend(changes=changes, latency=latency)
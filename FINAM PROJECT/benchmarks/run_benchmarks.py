@@ -0,0 +1,194 @@
+from typing import List, Dict, Any, Callable, Awaitable
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from app.core.config import settings
+from app.models.schemas import TimeWindow
+from app.services.market_data import MarketDataProvider
+from app.services.article_batch import ArticleBatch
+from benchmarks.corpus import generate_corpus, load_companies
+from benchmarks.fakes import FakeNewsServer, FakeLLM, fixture_market_backend
+
+logger = logging.getLogger("benchmarks")
+
+
+class StageRecorder:
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        self.stages[name] = {
+            "seconds": round(elapsed, 6),
+            "py_peak_mb": round(peak / 2 ** 20, 3),
+            "rss_max_mb": round(_max_rss_mb(), 3),
+        }
+        logger.info(f"⏱️ {name}: {elapsed:.3f}s, peak {peak / 2 ** 20:.1f} MB")
+
+    async def timed(self, name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.stage(name):
+            return await fn()
+
+
+def _max_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 2 ** 20 if sys.platform == "darwin" else usage / 2 ** 10
+
+
+def _configure(server: FakeNewsServer, args: argparse.Namespace, page_size: int, pages: int, workdir: str) -> None:
+    settings.PLATFORM_API_URL = server.base_url
+    settings.NEWS_SOURCES = []
+    settings.RSS_FEEDS = server.rss_urls
+    settings.MAX_NEWS_PER_SOURCE = page_size
+    settings.PLATFORM_MAX_PAGES = pages
+    settings.PLATFORM_PAGE_CONCURRENCY = args.page_concurrency
+    settings.NEWS_SOURCE_RATE_LIMIT = 0
+    settings.CLUSTERING_MODE = args.clustering_mode
+    settings.EMBEDDING_CACHE_PATH = ""
+    settings.ARTICLE_STORE_PATH = os.path.join(workdir, f"articles-{server.port}.sqlite3")
+    settings.SCHEDULER_ENABLED = False
+
+
+async def run_size(size: int, args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    from app.services.pipeline import RadarPipeline
+
+    now = datetime.now(timezone.utc)
+    corpus = generate_corpus(size, duplicate_rate=args.duplicate_rate, hours=args.hours, seed=args.seed, now=now)
+    rss_count = int(size * args.rss_share)
+    rss_items, platform_items = corpus[:rss_count], corpus[rss_count:]
+    rss_feeds = [rss_items[idx::args.rss_feeds] for idx in range(args.rss_feeds)] if rss_items else []
+
+    server = await FakeNewsServer(platform_items, rss_feeds, platform_latency=args.platform_latency,
+                                  rss_latency=args.rss_latency).start()
+    page_size = max(args.page_size, max((len(feed) for feed in rss_feeds), default=0))
+    _configure(server, args, page_size, max(1, math.ceil(len(platform_items) / page_size)), workdir)
+
+    recorder = StageRecorder()
+    fake_llm = FakeLLM(latency=args.llm_latency)
+    try:
+        pipeline = RadarPipeline()
+        pipeline.processor.warm_up()
+        pipeline.ranker.market_data = MarketDataProvider(
+            fixture_market_backend([c["ticker"] for c in load_companies()], latency=args.market_latency))
+        pipeline.generator._complete = fake_llm.complete
+        processor, collector = pipeline.processor, pipeline.collector
+        time_window = TimeWindow(hours=args.hours, end_time=now + timedelta(minutes=1))
+        window_start = now - timedelta(hours=args.hours)
+
+        await collector.start()
+        raw_news = await recorder.timed("collect", lambda: collector.platform_client.get_news(time_window))
+        raw_news.extend(await recorder.timed("rss", lambda: collector._collect_from_rss(time_window)))
+        raw_news = ArticleBatch.from_dicts(raw_news)
+
+        async def extract_entities():
+            processor._extract_entities(raw_news)
+
+        async def encode():
+            return processor._encode([processor._embedding_text(news) for news in raw_news])
+
+        async def cluster():
+            # entities and embeddings are warm at this point, so this isolates clustering
+            return processor.process_news(raw_news, window_start)
+
+        async def rank():
+            return pipeline.ranker.rank_clusters(clusters, settings.TOP_K_EVENTS)
+
+        await recorder.timed("entities", extract_entities)
+        await recorder.timed("encode", encode)
+        clusters = await recorder.timed("cluster", cluster)
+        ranked = await recorder.timed("rank", rank)
+        hot = [c for c in ranked if c["hotness"] >= settings.HOTNESS_THRESHOLD]
+        events = await recorder.timed("generate", lambda: pipeline.generator.generate_events(hot))
+        await collector.close()
+        pipeline.executor.shutdown()
+    finally:
+        await server.stop()
+
+    total = sum(stage["seconds"] for stage in recorder.stages.values())
+    return {
+        "size": size,
+        "articles_collected": len(raw_news),
+        "clusters": len(clusters),
+        "events": len(events),
+        "llm_calls": fake_llm.calls,
+        "http_requests": server.requests,
+        "total_seconds": round(total, 6),
+        "articles_per_second": round(len(raw_news) / total, 2) if total else None,
+        "stages": recorder.stages,
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    tracemalloc.start()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            logger.info(f"🏁 Бенчмарк на {size} статьях")
+            results.append(await run_size(size, args, workdir))
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "duplicate_rate": args.duplicate_rate,
+            "rss_share": args.rss_share,
+            "rss_feeds": args.rss_feeds,
+            "clustering_mode": args.clustering_mode,
+            "sentence_model": settings.SENTENCE_MODEL,
+            "spacy_model": settings.SPACY_MODEL,
+            "latency": {
+                "platform": args.platform_latency,
+                "rss": args.rss_latency,
+                "market": args.market_latency,
+                "llm": args.llm_latency,
+            },
+        },
+        "runs": results,
+    }
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline RADAR pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--duplicate-rate", type=float, default=0.3)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rss-share", type=float, default=0.2)
+    parser.add_argument("--rss-feeds", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--page-concurrency", type=int, default=8)
+    parser.add_argument("--clustering-mode", choices=["dbscan", "incremental"], default=settings.CLUSTERING_MODE)
+    parser.add_argument("--platform-latency", type=float, default=0.05)
+    parser.add_argument("--rss-latency", type=float, default=0.1)
+    parser.add_argument("--market-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--output", help="write JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    cli_args = parse_args(sys.argv[1:])
+    report = asyncio.run(main(cli_args))
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if cli_args.output:
+        with open(cli_args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
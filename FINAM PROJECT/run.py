@@ -1,28 +1,43 @@
 import uvicorn
-from apscheduler.schedulers.background import BackgroundScheduler
-from app.services.pipeline import RadarPipeline
-from app.models.schemas import TimeWindow
 from app.core.config import settings
 import logging
+import os
+import shutil
+import subprocess
+import sys
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-if __name__ == "__main__":
-    pipeline = RadarPipeline()
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        lambda: pipeline.process_time_window(TimeWindow(hours=24)),
-        'interval',
-        hours=1
-    )
-    scheduler.start()
-    logger.info("🕐 Scheduler запущен: анализ каждый час")
 
-    uvicorn.run(
-        "app.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=True,
-        log_level="info"
-    )
+def run_multi_worker():
+    metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join("data", "prometheus"))
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    ingest = subprocess.Popen([sys.executable, "-m", "app.ingest"])
+    logger.info(f"🛰️ Ingest-процесс запущен (pid {ingest.pid}), API-воркеров: {settings.API_WORKERS}")
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=settings.API_WORKERS,
+            log_level="info"
+        )
+    finally:
+        ingest.terminate()
+        ingest.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    if settings.DEPLOYMENT_MODE == "multi":
+        run_multi_worker()
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.RELOAD,
+            log_level="info"
+        )